@@ -0,0 +1,91 @@
+"""Compare `parallel_sum` with the buffer-based `scatter_sum`.
+
+Run under MPI at one rank count:
+
+    mpiexec -n 4 python bench_hpc_utils.py --n 10000000
+
+or let the script launch itself at several rank counts:
+
+    python bench_hpc_utils.py --n 10000000 --ranks 1 2 4 8
+
+`scatter_sum` is timed including the scatter from rank 0, whereas
+`parallel_sum` is handed an array every rank already holds in full; the
+last column shows the array memory each approach needs per rank.
+"""
+import argparse
+import pickle
+import shlex
+import subprocess
+import sys
+import mpi4py
+# The launcher process for --ranks must not initialise MPI itself
+mpi4py.rc.initialize = False
+from mpi4py import MPI
+import numpy as np
+from hpc_utils import parallel_sum, scatter_sum, split_counts
+
+def time_call(comm, func, repeat):
+    """Best wall time of `func` over `repeat` runs, the slowest rank counting."""
+    best = np.inf
+    for _ in range(repeat):
+        comm.Barrier()
+        start = MPI.Wtime()
+        func()
+        elapsed = np.array([MPI.Wtime() - start])
+        comm.Allreduce(MPI.IN_PLACE, elapsed, op=MPI.MAX)
+        best = min(best, elapsed[0])
+    return best
+
+def run(n, repeat):
+    comm = MPI.COMM_WORLD
+    rank, size = comm.Get_rank(), comm.Get_size()
+    itemsize = np.dtype(np.float64).itemsize
+
+    # parallel_sum needs the whole array on every rank and pickles the partial sums
+    full_data = np.random.default_rng(0).random(n)
+    pickled = len(pickle.dumps(np.sum(full_data[:1])))
+    object_time = time_call(comm, lambda: parallel_sum(full_data), repeat)
+    object_bytes = (size - 1) * pickled
+    object_resident = n * itemsize
+    del full_data
+
+    # scatter_sum only keeps the array on rank 0 and moves raw buffers
+    data = np.random.default_rng(0).random(n) if rank == 0 else None
+    buffer_time = time_call(comm, lambda: scatter_sum(data), repeat)
+    counts = split_counts(n, size)
+    buffer_bytes = (n - counts[0]) * itemsize + (size - 1) * itemsize
+    buffer_resident = counts[1 if size > 1 else 0] * itemsize
+
+    if rank == 0:
+        print(f"{size:>5} {'parallel_sum':>12} {object_time * 1e3:>10.2f} "
+              f"{object_bytes:>14,} {object_resident:>16,}")
+        print(f"{size:>5} {'scatter_sum':>12} {buffer_time * 1e3:>10.2f} "
+              f"{buffer_bytes:>14,} {buffer_resident:>16,}")
+
+def header():
+    print(f"{'ranks':>5} {'method':>12} {'wall_ms':>10} {'bytes_moved':>14} "
+          f"{'array_bytes/rank':>16}", flush=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=10_000_000, help="number of float64 values")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--ranks", type=int, nargs="*",
+                        help="launch the benchmark once per rank count")
+    parser.add_argument("--mpiexec", default="mpiexec", help="MPI launcher command")
+    parser.add_argument("--no-header", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.ranks:
+        header()
+        for ranks in args.ranks:
+            command = shlex.split(args.mpiexec) + [
+                "-n", str(ranks), sys.executable, __file__,
+                "--n", str(args.n), "--repeat", str(args.repeat), "--no-header"]
+            subprocess.run(command, check=True)
+    else:
+        MPI.Init()
+        if MPI.COMM_WORLD.Get_rank() == 0 and not args.no_header:
+            header()
+        run(args.n, args.repeat)
+        MPI.Finalize()
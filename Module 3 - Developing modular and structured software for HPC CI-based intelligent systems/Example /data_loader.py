@@ -1,3 +1,4 @@
+from typing import Dict, Iterator, List, Optional
 import pandas as pd
 
 def load_data(file_path: str) -> pd.DataFrame:
@@ -5,6 +6,51 @@ def load_data(file_path: str) -> pd.DataFrame:
     data = pd.read_csv(file_path)
     return data
 
+def downcast_data(data: pd.DataFrame) -> pd.DataFrame:
+    """Downcast numeric columns to the smallest dtype that holds their values."""
+    for column in data.select_dtypes(include="integer").columns:
+        data[column] = pd.to_numeric(data[column], downcast="integer")
+    for column in data.select_dtypes(include="floating").columns:
+        data[column] = pd.to_numeric(data[column], downcast="float")
+    return data
+
+def load_data_chunks(file_path: str, chunk_size: int = 100_000,
+                     columns: Optional[List[str]] = None,
+                     dtypes: Optional[Dict[str, str]] = None,
+                     downcast: bool = False) -> Iterator[pd.DataFrame]:
+    """Stream a CSV file as DataFrames of at most `chunk_size` rows.
+
+    Only `columns` are parsed, so peak memory depends on the chunk size and
+    the selected columns rather than on the size of the file.
+    """
+    with pd.read_csv(file_path, usecols=columns, dtype=dtypes,
+                     chunksize=chunk_size) as reader:
+        for chunk in reader:
+            if downcast:
+                chunk = downcast_data(chunk)
+            yield chunk
+
+def count_rows(file_path: str, block_size: int = 1 << 20) -> int:
+    """Count the data rows of a CSV file without parsing it."""
+    newlines = 0
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            newlines += block.count(b"\n")
+            last = block
+    if newlines and not last.endswith(b"\n"):
+        newlines += 1
+    return max(newlines - 1, 0)
+
+def load_data_shard(file_path: str, rank: int, size: int) -> pd.DataFrame:
+    """Load only the rows `np.array_split` would assign to `rank` out of `size`."""
+    n_rows = count_rows(file_path)
+    base, extra = divmod(n_rows, size)
+    start = rank * base + min(rank, extra)
+    stop = start + base + (rank < extra)
+    # Row 0 is the header, data row i is file row i + 1
+    return pd.read_csv(file_path, skiprows=lambda i: 0 < i <= start,
+                       nrows=stop - start)
+
 if __name__ == "__main__":
     data = load_data("data/sample_data.csv")
     print(data.head())
@@ -1,4 +1,6 @@
+from typing import Optional, Tuple
 from mpi4py import MPI
+from mpi4py.util.dtlib import from_numpy_dtype
 import numpy as np
 
 def parallel_sum(data: np.ndarray) -> float:
@@ -16,6 +18,138 @@ def parallel_sum(data: np.ndarray) -> float:
     
     return total_sum
 
+def split_counts(n_rows: int, size: int) -> np.ndarray:
+    """Number of rows each rank receives, matching `np.array_split`."""
+    base, extra = divmod(n_rows, size)
+    return np.array([base + (rank < extra) for rank in range(size)])
+
+def scatter_array(data: Optional[np.ndarray], comm=None, root: int = 0) -> np.ndarray:
+    """Scatter the rows of an array held only by `root` with `Scatterv`.
+
+    The other ranks pass None and only ever allocate their own shard.
+    """
+    comm = comm or MPI.COMM_WORLD
+    rank = comm.Get_rank()
+    if rank == root:
+        data = np.ascontiguousarray(data)
+        header = (data.shape, data.dtype.str)
+    else:
+        header = None
+    shape, dtype = comm.bcast(header, root=root)
+
+    row_size = int(np.prod(shape[1:], dtype=np.int64))
+    counts = split_counts(shape[0], comm.Get_size())
+    local_data = np.empty((counts[rank],) + tuple(shape[1:]), dtype=dtype)
+    item_counts = counts * row_size
+    displacements = np.concatenate(([0], np.cumsum(item_counts)[:-1]))
+    mpi_type = from_numpy_dtype(dtype)
+    send = [data, item_counts, displacements, mpi_type] if rank == root else None
+    comm.Scatterv(send, [local_data, mpi_type], root=root)
+    return local_data
+
+def _accumulator(local_data: np.ndarray) -> np.dtype:
+    """Dtype reductions accumulate in: int64 for integers, float64 otherwise."""
+    if np.issubdtype(local_data.dtype, np.integer) or local_data.dtype == bool:
+        return np.dtype(np.int64)
+    return np.dtype(np.float64)
+
+def scatter_sum(data: Optional[np.ndarray], comm=None, root: int = 0):
+    """Buffer-based `parallel_sum`: only `root` holds the array and the result."""
+    comm = comm or MPI.COMM_WORLD
+    local_data = scatter_array(data, comm, root)
+    local_sum = np.array([local_data.sum(dtype=_accumulator(local_data))])
+    total_sum = np.empty_like(local_sum) if comm.Get_rank() == root else None
+    comm.Reduce(local_sum, total_sum, op=MPI.SUM, root=root)
+    return total_sum[0] if comm.Get_rank() == root else None
+
+def global_sum(local_data: np.ndarray, comm=None):
+    """Sum of the shards of all ranks, returned on every rank."""
+    comm = comm or MPI.COMM_WORLD
+    total = np.array([local_data.sum(dtype=_accumulator(local_data))])
+    comm.Allreduce(MPI.IN_PLACE, total, op=MPI.SUM)
+    return total[0]
+
+def global_mean(local_data: np.ndarray, comm=None) -> float:
+    """Mean of the shards of all ranks, returned on every rank."""
+    comm = comm or MPI.COMM_WORLD
+    totals = np.array([local_data.sum(dtype=np.float64), local_data.size], dtype=np.float64)
+    comm.Allreduce(MPI.IN_PLACE, totals, op=MPI.SUM)
+    return totals[0] / totals[1]
+
+def global_var(local_data: np.ndarray, ddof: int = 0, comm=None) -> float:
+    """Variance of the shards of all ranks, returned on every rank.
+
+    Squared deviations are taken from the global mean (two passes), which
+    avoids the cancellation of the E[x^2] - E[x]^2 formula.
+    """
+    comm = comm or MPI.COMM_WORLD
+    mean = global_mean(local_data, comm)
+    totals = np.array([((local_data - mean) ** 2).sum(dtype=np.float64), local_data.size],
+                      dtype=np.float64)
+    comm.Allreduce(MPI.IN_PLACE, totals, op=MPI.SUM)
+    return totals[0] / (totals[1] - ddof)
+
+def global_min_max(local_data: np.ndarray, comm=None) -> Tuple[float, float]:
+    """Minimum and maximum of the shards of all ranks, returned on every rank."""
+    comm = comm or MPI.COMM_WORLD
+    dtype = _accumulator(local_data)
+    if np.issubdtype(dtype, np.integer):
+        low, high = np.iinfo(dtype).max, np.iinfo(dtype).min
+    else:
+        low, high = np.inf, -np.inf
+    # Empty shards contribute the identity of each reduction
+    local_min = np.array([local_data.min() if local_data.size else low], dtype=dtype)
+    local_max = np.array([local_data.max() if local_data.size else high], dtype=dtype)
+    comm.Allreduce(MPI.IN_PLACE, local_min, op=MPI.MIN)
+    comm.Allreduce(MPI.IN_PLACE, local_max, op=MPI.MAX)
+    return local_min[0], local_max[0]
+
+def global_histogram(local_data: np.ndarray, bins: int = 10,
+                     range: Optional[Tuple[float, float]] = None,
+                     comm=None) -> Tuple[np.ndarray, np.ndarray]:
+    """Histogram of the shards of all ranks, returned on every rank.
+
+    All ranks must bin with the same edges, so without `range` the global
+    minimum and maximum are computed first.
+    """
+    comm = comm or MPI.COMM_WORLD
+    if range is None:
+        range = tuple(float(value) for value in global_min_max(local_data, comm))
+    counts, edges = np.histogram(local_data, bins=bins, range=range)
+    counts = counts.astype(np.int64)
+    comm.Allreduce(MPI.IN_PLACE, counts, op=MPI.SUM)
+    return counts, edges
+
+def global_dot(local_a: np.ndarray, local_b: np.ndarray, comm=None):
+    """Dot product of two vectors sharded identically across ranks."""
+    comm = comm or MPI.COMM_WORLD
+    dtype = np.result_type(_accumulator(local_a), _accumulator(local_b))
+    total = np.array([np.dot(local_a.astype(dtype, copy=False),
+                             local_b.astype(dtype, copy=False))])
+    comm.Allreduce(MPI.IN_PLACE, total, op=MPI.SUM)
+    return total[0]
+
+def allreduce_scaler(scaler, comm=None):
+    """Merge the running scaler statistics of every rank, in place, on all ranks."""
+    comm = comm or MPI.COMM_WORLD
+    n_features = len(scaler.columns)
+    count = np.array([scaler.count], dtype=np.float64)
+    mean = scaler.mean if scaler.count else np.zeros(n_features)
+    m2 = scaler.m2 if scaler.count else np.zeros(n_features)
+
+    total = np.empty_like(count)
+    comm.Allreduce(count, total, op=MPI.SUM)
+    global_sum = np.empty(n_features)
+    comm.Allreduce(mean * count, global_sum, op=MPI.SUM)
+    global_mean = global_sum / total
+
+    # Shift each rank's M2 to the global mean before summing them
+    global_m2 = np.empty(n_features)
+    comm.Allreduce(m2 + count * (mean - global_mean) ** 2, global_m2, op=MPI.SUM)
+
+    scaler.count, scaler.mean, scaler.m2 = int(total[0]), global_mean, global_m2
+    return scaler
+
 if __name__ == "__main__":
     data = np.arange(1000)
     total_sum = parallel_sum(data)
@@ -1,18 +1,21 @@
-from data_loader import load_data
-from preprocessor import preprocess_data
-from model import train_model, save_model
-from hpc_utils import parallel_sum
+from data_loader import load_data, load_data_chunks, load_data_shard
+from preprocessor import RunningScaler, preprocess_data, fit_scaler, preprocess_chunks
+from model import train_model, train_model_stream, train_model_distributed, save_model
+from hpc_utils import parallel_sum, allreduce_scaler
+from mpi4py import MPI
+import numpy as np
 import pandas as pd
 
 def main():
     # Load and preprocess the data
     data = load_data("data/sample_data.csv")
     target = data.pop("target")
-    processed_data = preprocess_data(data)
+    scaler = RunningScaler()
+    processed_data = preprocess_data(data, scaler)
     
-    # Train the model
+    # Train the model and keep the scaler statistics next to it for inference
     model = train_model(processed_data, target)
-    save_model(model, "models/logistic_model.joblib")
+    save_model(model, "models/logistic_model.joblib", scaler=scaler)
     
     # Example of HPC utility
     data_array = processed_data.to_numpy().flatten()
@@ -20,5 +23,40 @@ def main():
     if MPI.COMM_WORLD.Get_rank() == 0:
         print(f"Total Sum: {total_sum}")
 
+def split_target(chunks, target_column="target"):
+    """Split each chunk of a stream into its features and its target."""
+    for chunk in chunks:
+        target = chunk.pop(target_column)
+        yield chunk, target
+
+def main_streaming(file_path="data/sample_data.csv", chunk_size=100_000):
+    # Only one chunk is held in memory at a time, so the file is read in
+    # separate passes: the target column alone, then to fit the scaler, then
+    # to train the model.
+    classes = np.unique(np.concatenate([
+        chunk["target"].unique()
+        for chunk in load_data_chunks(file_path, chunk_size, columns=["target"])
+    ]))
+
+    chunks = load_data_chunks(file_path, chunk_size, downcast=True)
+    scaler = fit_scaler(data for data, _ in split_target(chunks))
+
+    chunks = load_data_chunks(file_path, chunk_size, downcast=True)
+    model = train_model_stream(split_target(preprocess_chunks(chunks, scaler)),
+                               classes)
+    save_model(model, "models/logistic_model.joblib", scaler=scaler)
+
+def main_distributed(file_path="data/sample_data.csv"):
+    # Each rank only ever loads and scales its own shard of the file
+    comm = MPI.COMM_WORLD
+    data = load_data_shard(file_path, comm.Get_rank(), comm.Get_size())
+    target = data.pop("target")
+    scaler = allreduce_scaler(RunningScaler(list(data.columns)).partial_fit(data))
+    processed_data = preprocess_data(data, scaler, update=False)
+
+    model = train_model_distributed(processed_data, target)
+    if comm.Get_rank() == 0:
+        save_model(model, "models/logistic_model.joblib", scaler=scaler)
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,12 @@
-from sklearn.linear_model import LogisticRegression
+from typing import Iterable, Optional, Sequence, Tuple
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from scipy.optimize import minimize
+from scipy.special import expit, log_expit, logsumexp, softmax
+from mpi4py import MPI
+import numpy as np
 import pandas as pd
 from joblib import dump, load
+from preprocessor import RunningScaler, save_scaler, scaler_path
 
 def train_model(data: pd.DataFrame, target: pd.Series) -> LogisticRegression:
     """Train a logistic regression model."""
@@ -8,9 +14,97 @@ def train_model(data: pd.DataFrame, target: pd.Series) -> LogisticRegression:
     model.fit(data, target)
     return model
 
-def save_model(model: LogisticRegression, file_path: str):
-    """Save the trained model to a file."""
+def train_model_stream(chunks: Iterable[Tuple[pd.DataFrame, pd.Series]],
+                       classes: Sequence) -> SGDClassifier:
+    """Train a logistic regression model one (data, target) chunk at a time.
+
+    All class labels must be known up front because a single chunk may not
+    contain every class.
+    """
+    model = SGDClassifier(loss="log_loss")
+    for data, target in chunks:
+        model.partial_fit(data, target, classes=classes)
+    return model
+
+def _local_loss_and_grad(params: np.ndarray, data: np.ndarray, labels: np.ndarray,
+                         n_classes: int) -> Tuple[float, np.ndarray]:
+    """Summed log-loss of the local shard and its gradient w.r.t. (coef, intercept)."""
+    n_outputs = 1 if n_classes == 2 else n_classes
+    weights = params.reshape(n_outputs, data.shape[1] + 1)
+    logits = data @ weights[:, :-1].T + weights[:, -1]
+    if n_classes == 2:
+        logits = logits[:, 0]
+        positive = labels == 1
+        loss = -(log_expit(logits[positive]).sum() + log_expit(-logits[~positive]).sum())
+        error = (expit(logits) - positive)[:, np.newaxis]
+    else:
+        loss = (logsumexp(logits, axis=1) - logits[np.arange(len(labels)), labels]).sum()
+        error = softmax(logits, axis=1)
+        error[np.arange(len(labels)), labels] -= 1.0
+    grad = np.hstack([error.T @ data, error.sum(axis=0)[:, np.newaxis]])
+    return loss, grad.ravel()
+
+def train_model_distributed(data: pd.DataFrame, target: pd.Series, C: float = 1.0,
+                            max_iter: int = 100, file_path: Optional[str] = None,
+                            comm=None) -> LogisticRegression:
+    """Train a logistic regression model on data sharded across MPI ranks.
+
+    Every rank passes only its own shard, e.g. `np.array_split(data, size)[rank]`
+    or `load_data_shard`. The shard losses and gradients are summed with a
+    single Allreduce per step, so all ranks follow the same L-BFGS path and end
+    up with the same model, which rank 0 saves to `file_path` if given.
+    """
+    comm = comm or MPI.COMM_WORLD
+    local_data = np.asarray(data, dtype=np.float64)
+    local_target = np.asarray(target)
+
+    # Class labels and the sample count are tiny, so they are agreed on up front
+    classes = np.unique(np.concatenate(comm.allgather(np.unique(local_target))))
+    labels = np.searchsorted(classes, local_target)
+    n_samples = np.array([len(local_data)], dtype=np.float64)
+    comm.Allreduce(MPI.IN_PLACE, n_samples, op=MPI.SUM)
+
+    n_features = local_data.shape[1]
+    n_outputs = 1 if len(classes) == 2 else len(classes)
+    penalty_mask = np.ones((n_outputs, n_features + 1))
+    penalty_mask[:, -1] = 0.0  # the intercept is not regularised
+    penalty_mask = penalty_mask.ravel()
+    buffer = np.empty(1 + penalty_mask.size)
+
+    def objective(params):
+        # Same objective as LogisticRegression: C * sum(loss) + ||w||^2 / 2,
+        # divided by C * n_samples to keep its scale independent of the data size
+        loss, grad = _local_loss_and_grad(params, local_data, labels, len(classes))
+        buffer[0] = loss
+        buffer[1:] = grad
+        comm.Allreduce(MPI.IN_PLACE, buffer, op=MPI.SUM)
+        penalty = penalty_mask * params / C
+        value = (buffer[0] + 0.5 * penalty @ params) / n_samples[0]
+        return value, (buffer[1:] + penalty) / n_samples[0]
+
+    result = minimize(objective, np.zeros(penalty_mask.size), jac=True,
+                      method="L-BFGS-B", options={"maxiter": max_iter})
+
+    weights = result.x.reshape(n_outputs, n_features + 1)
+    model = LogisticRegression(C=C, max_iter=max_iter)
+    model.classes_ = classes
+    model.coef_ = weights[:, :-1].copy()
+    model.intercept_ = weights[:, -1].copy()
+    model.n_features_in_ = n_features
+    model.n_iter_ = np.array([result.nit])
+    if isinstance(data, pd.DataFrame):
+        model.feature_names_in_ = np.asarray(data.columns, dtype=object)
+
+    if file_path is not None and comm.Get_rank() == 0:
+        save_model(model, file_path)
+    return model
+
+def save_model(model: LogisticRegression, file_path: str,
+               scaler: Optional[RunningScaler] = None):
+    """Save the trained model to a file, and its scaler next to it if given."""
     dump(model, file_path)
+    if scaler is not None:
+        save_scaler(scaler, scaler_path(file_path))
 
 def load_model(file_path: str) -> LogisticRegression:
     """Load a trained model from a file."""
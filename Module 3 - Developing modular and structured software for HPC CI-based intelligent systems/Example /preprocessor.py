@@ -1,12 +1,131 @@
+import os
+from functools import reduce
+from typing import Iterable, Iterator, List, Optional
 from sklearn.preprocessing import StandardScaler
+from joblib import dump, load
+import numpy as np
 import pandas as pd
 
-def preprocess_data(data: pd.DataFrame) -> pd.DataFrame:
-    """Preprocess the data by scaling the features."""
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(data)
+class RunningScaler:
+    """Standard scaler built from running moments that can be updated and merged.
+
+    The count, mean and sum of squared deviations (M2) of each feature are
+    combined with Chan et al.'s pairwise update, so chunks, shards or ranks can
+    be fitted separately and merged into the statistics of a single full fit.
+    """
+
+    def __init__(self, columns: Optional[List[str]] = None):
+        self.columns = columns
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+
+    @property
+    def feature_names_in_(self) -> np.ndarray:
+        return np.asarray(self.columns, dtype=object)
+
+    @property
+    def var_(self) -> np.ndarray:
+        return self.m2 / self.count
+
+    @property
+    def scale_(self) -> np.ndarray:
+        scale = np.sqrt(self.var_)
+        scale[scale == 0.0] = 1.0
+        return scale
+
+    def _combine(self, count: int, mean: np.ndarray, m2: np.ndarray):
+        if self.count == 0:
+            self.count, self.mean, self.m2 = count, mean.copy(), m2.copy()
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+    def partial_fit(self, data: pd.DataFrame) -> "RunningScaler":
+        """Update the statistics with one more chunk of data."""
+        if self.columns is None:
+            self.columns = list(data.columns)
+        values = np.asarray(data, dtype=np.float64)
+        if len(values) > 0:
+            mean = values.mean(axis=0)
+            m2 = ((values - mean) ** 2).sum(axis=0)
+            self._combine(len(values), mean, m2)
+        return self
+
+    def merge(self, other: "RunningScaler") -> "RunningScaler":
+        """Fold the statistics of a scaler fitted on other data into this one."""
+        if self.columns is None:
+            self.columns = other.columns
+        elif other.columns is not None and list(other.columns) != list(self.columns):
+            raise ValueError("Cannot merge scalers fitted on different columns")
+        if other.count > 0:
+            self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def transform(self, data: pd.DataFrame) -> np.ndarray:
+        """Scale the data with the current statistics, keeping float32 inputs float32."""
+        values = np.asarray(data)
+        dtype = values.dtype if values.dtype == np.float32 else np.float64
+        return ((values - self.mean) / self.scale_).astype(dtype, copy=False)
+
+def merge_scalers(scalers: Iterable[RunningScaler]) -> RunningScaler:
+    """Merge scalers fitted on different shards into a new scaler."""
+    return reduce(RunningScaler.merge, scalers, RunningScaler())
+
+def scaler_path(model_path: str) -> str:
+    """Return the path the scaler of a saved model is stored at."""
+    root, _ = os.path.splitext(model_path)
+    return root + ".scaler.joblib"
+
+def save_scaler(scaler: RunningScaler, file_path: str):
+    """Save the scaler statistics to a file."""
+    dump(scaler, file_path)
+
+def load_scaler(file_path: str) -> RunningScaler:
+    """Load scaler statistics from a file."""
+    return load(file_path)
+
+def preprocess_data(data: pd.DataFrame,
+                    scaler: Optional[RunningScaler] = None,
+                    update: bool = True) -> pd.DataFrame:
+    """Preprocess the data by scaling the features.
+
+    Without a scaler a new one is fitted on the data. A RunningScaler passed in
+    is updated with the data first (unless `update` is False, e.g. at
+    inference time), so the statistics of earlier runs are kept rather than
+    refitted from scratch.
+    """
+    if scaler is None:
+        scaler = StandardScaler()
+        scaled_data = scaler.fit_transform(data)
+    else:
+        if update:
+            scaler.partial_fit(data)
+        scaled_data = scaler.transform(data)
     return pd.DataFrame(scaled_data, columns=data.columns)
 
+def fit_scaler(chunks: Iterable[pd.DataFrame]) -> RunningScaler:
+    """Fit a scaler one chunk at a time, without holding the whole dataset."""
+    scaler = RunningScaler()
+    for chunk in chunks:
+        scaler.partial_fit(chunk)
+    return scaler
+
+def preprocess_chunks(chunks: Iterable[pd.DataFrame],
+                      scaler: RunningScaler) -> Iterator[pd.DataFrame]:
+    """Scale a stream of chunks with an already fitted scaler.
+
+    Columns the scaler was not fitted on, such as the target, are passed
+    through unchanged.
+    """
+    columns = list(scaler.feature_names_in_)
+    for chunk in chunks:
+        chunk[columns] = scaler.transform(chunk[columns])
+        yield chunk
+
 if __name__ == "__main__":
     data = pd.read_csv("data/sample_data.csv")
     processed_data = preprocess_data(data)
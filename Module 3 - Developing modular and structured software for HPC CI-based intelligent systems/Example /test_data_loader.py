@@ -1,5 +1,8 @@
+import os
+import tempfile
 import unittest
-from data_loader import load_data
+from data_loader import load_data, load_data_chunks
+import numpy as np
 import pandas as pd
 
 class TestDataLoader(unittest.TestCase):
@@ -7,5 +10,23 @@ class TestDataLoader(unittest.TestCase):
         data = load_data("data/sample_data.csv")
         self.assertIsInstance(data, pd.DataFrame)
 
+    def test_load_data_chunks(self):
+        data = pd.DataFrame({
+            'A': np.arange(10, dtype=np.int64),
+            'B': np.linspace(0, 1, 10),
+            'C': np.arange(10, dtype=np.int64)
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "data.csv")
+            data.to_csv(file_path, index=False)
+            chunks = list(load_data_chunks(file_path, chunk_size=4,
+                                           columns=['A', 'B'], downcast=True))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [4, 4, 2])
+        self.assertEqual(list(chunks[0].columns), ['A', 'B'])
+        self.assertEqual(chunks[0]['A'].dtype, np.int8)
+        self.assertEqual(chunks[0]['B'].dtype, np.float32)
+        np.testing.assert_array_equal(pd.concat(chunks)['A'], data['A'])
+
 if __name__ == "__main__":
     unittest.main()
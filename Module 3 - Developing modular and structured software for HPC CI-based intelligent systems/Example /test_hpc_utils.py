@@ -1,14 +1,55 @@
 import unittest
 import numpy as np
-from hpc_utils import parallel_sum
+from hpc_utils import (parallel_sum, scatter_array, scatter_sum, global_sum, global_mean,
+                       global_var, global_min_max, global_histogram, global_dot)
 from mpi4py import MPI
 
 class TestHPCUtils(unittest.TestCase):
+    def setUp(self):
+        self.comm = MPI.COMM_WORLD
+        self.rank = self.comm.Get_rank()
+        self.full_data = np.random.default_rng(0).normal(size=101)
+        self.data = self.full_data if self.rank == 0 else None
+
     def test_parallel_sum(self):
         data = np.arange(100)
         total_sum = parallel_sum(data)
         if MPI.COMM_WORLD.Get_rank() == 0:
             self.assertEqual(total_sum, np.sum(data))
 
+    def test_scatter_array(self):
+        data = np.arange(30).reshape(10, 3) if self.rank == 0 else None
+        local_data = scatter_array(data)
+        expected = np.array_split(np.arange(30).reshape(10, 3), self.comm.Get_size())[self.rank]
+        np.testing.assert_array_equal(local_data, expected)
+
+    def test_scatter_sum(self):
+        data = np.arange(100) if self.rank == 0 else None
+        total_sum = scatter_sum(data)
+        if self.rank == 0:
+            self.assertEqual(total_sum, np.sum(np.arange(100)))
+        else:
+            self.assertIsNone(total_sum)
+
+    def test_global_statistics(self):
+        local_data = scatter_array(self.data)
+        self.assertAlmostEqual(global_sum(local_data), self.full_data.sum())
+        self.assertAlmostEqual(global_mean(local_data), self.full_data.mean())
+        self.assertAlmostEqual(global_var(local_data, ddof=1), self.full_data.var(ddof=1))
+        self.assertEqual(global_min_max(local_data),
+                         (self.full_data.min(), self.full_data.max()))
+
+    def test_global_histogram(self):
+        local_data = scatter_array(self.data)
+        counts, edges = global_histogram(local_data, bins=8)
+        expected_counts, expected_edges = np.histogram(self.full_data, bins=8)
+        np.testing.assert_array_equal(counts, expected_counts)
+        np.testing.assert_allclose(edges, expected_edges)
+
+    def test_global_dot(self):
+        local_a = scatter_array(self.data)
+        local_b = scatter_array(np.arange(101) if self.rank == 0 else None)
+        self.assertAlmostEqual(global_dot(local_a, local_b), self.full_data @ np.arange(101))
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,7 +1,9 @@
 import unittest
-from model import train_model, save_model, load_model
+from model import train_model, train_model_stream, train_model_distributed, save_model, load_model
+from mpi4py import MPI
+import numpy as np
 import pandas as pd
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 
 class TestModel(unittest.TestCase):
     def test_train_model(self):
@@ -12,7 +14,27 @@ class TestModel(unittest.TestCase):
         target = pd.Series([0, 1, 0, 1])
         model = train_model(data, target)
         self.assertIsInstance(model, LogisticRegression)
+
+    def test_train_model_stream(self):
+        chunks = [
+            (pd.DataFrame({'A': [1, 2], 'B': [5, 6]}), pd.Series([0, 0])),
+            (pd.DataFrame({'A': [3, 4], 'B': [7, 8]}), pd.Series([1, 1]))
+        ]
+        model = train_model_stream(iter(chunks), classes=[0, 1])
+        self.assertIsInstance(model, SGDClassifier)
+        self.assertEqual(list(model.classes_), [0, 1])
     
+    def test_train_model_distributed(self):
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame(rng.normal(size=(200, 3)), columns=['A', 'B', 'C'])
+        target = pd.Series(rng.integers(0, 3, 200))
+        comm = MPI.COMM_WORLD
+        shard = np.array_split(np.arange(200), comm.Get_size())[comm.Get_rank()]
+        model = train_model_distributed(data.iloc[shard], target.iloc[shard], max_iter=1000)
+        expected = LogisticRegression(tol=1e-10, max_iter=1000).fit(data, target)
+        np.testing.assert_allclose(model.coef_, expected.coef_, atol=1e-3)
+        np.testing.assert_allclose(model.predict_proba(data), expected.predict_proba(data), atol=1e-4)
+
     def test_save_and_load_model(self):
         model = LogisticRegression()
         save_model(model, "models/test_model.joblib")
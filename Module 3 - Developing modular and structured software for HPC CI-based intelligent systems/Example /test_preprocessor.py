@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+from preprocessor import RunningScaler, merge_scalers, preprocess_data, scaler_path, load_scaler
+from model import save_model
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+class TestPreprocessor(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({
+            'A': rng.normal(3.0, 2.0, 100),
+            'B': rng.normal(-1.0, 0.5, 100),
+            'C': np.ones(100)
+        })
+
+    def test_preprocess_data(self):
+        processed_data = preprocess_data(self.data)
+        self.assertIsInstance(processed_data, pd.DataFrame)
+        np.testing.assert_allclose(processed_data.mean(), 0.0, atol=1e-12)
+
+    def test_running_scaler_matches_full_fit(self):
+        scaler = RunningScaler()
+        for start in range(0, 100, 15):
+            scaler.partial_fit(self.data.iloc[start:start + 15])
+        expected = StandardScaler().fit(self.data)
+        np.testing.assert_allclose(scaler.mean, expected.mean_)
+        np.testing.assert_allclose(scaler.var_, expected.var_)
+        np.testing.assert_allclose(scaler.transform(self.data), expected.transform(self.data))
+
+    def test_merge_scalers(self):
+        shards = [self.data.iloc[:10], self.data.iloc[10:60], self.data.iloc[60:]]
+        merged = merge_scalers(RunningScaler().partial_fit(shard) for shard in shards)
+        full = RunningScaler().partial_fit(self.data)
+        self.assertEqual(merged.count, full.count)
+        np.testing.assert_allclose(merged.mean, full.mean)
+        np.testing.assert_allclose(merged.m2, full.m2)
+
+    def test_preprocess_data_reuses_scaler(self):
+        scaler = RunningScaler()
+        preprocess_data(self.data[:50], scaler)
+        preprocess_data(self.data[50:], scaler)
+        processed_data = preprocess_data(self.data, scaler, update=False)
+        self.assertEqual(scaler.count, 100)
+        np.testing.assert_allclose(processed_data.mean(), 0.0, atol=1e-12)
+
+    def test_save_scaler_with_model(self):
+        scaler = RunningScaler().partial_fit(self.data)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, "model.joblib")
+            save_model(LogisticRegression(), model_path, scaler=scaler)
+            loaded_scaler = load_scaler(scaler_path(model_path))
+        np.testing.assert_allclose(loaded_scaler.mean, scaler.mean)
+        self.assertEqual(loaded_scaler.columns, ['A', 'B', 'C'])
+
+if __name__ == "__main__":
+    unittest.main()
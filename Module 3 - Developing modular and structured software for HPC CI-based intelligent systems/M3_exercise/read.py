@@ -10,30 +10,87 @@ import cv2
 from tensorflow.keras.applications.resnet50 import preprocess_input, decode_predictions
 
 import numpy as np
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-model = load_model("test.h5")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
 
-#Resizze to 28px28p
-#Use painteditor with 3-5pixel tickness
-img = Image.open('/mnt/c/Users/Anubhav_R/Desktop/tmp/AIHPC/3.png').convert("L")
 
-plt.subplot(1, 2, 1)
-img_tmp = np.resize(img, (28,28))
-plt.imshow(img_tmp)
-plt.savefig('temp')
+def load_digit(path):
+    # Grayscale 28x28 uint8 digit, scaled to [0, 1] later for the whole batch
+    img = Image.open(path).convert("L")
+    if img.size != (28, 28):
+        img = img.resize((28, 28))
+    return np.asarray(img, dtype=np.uint8)
 
 
-img = np.resize(img, (28,28))
-im2arr = np.array(img)
-im2arr = im2arr.reshape(1,28,28,1)
+def classify_image(model, path):
+    #Resizze to 28px28p
+    #Use painteditor with 3-5pixel tickness
+    img_tmp = load_digit(path)
 
-#y_pred = model.predict(im2arr)
-#print(decode_predictions(y_pred, top=3)[0])
+    plt.subplot(1, 2, 1)
+    plt.imshow(img_tmp)
+    plt.savefig('temp')
 
-im2arr = im2arr / 255 
+    #y_pred = model.predict(im2arr)
+    #print(decode_predictions(y_pred, top=3)[0])
 
-yh = np.argmax(model.predict(im2arr.reshape(1,28,28,1)), axis=-1)
-print(yh)
+    im2arr = img_tmp.reshape(1,28,28,1) / 255
 
+    yh = np.argmax(model.predict(im2arr), axis=-1)
+    print(yh)
 
 
+def classify_directory(model, directory, output, batch_size=1024, workers=8):
+    # Decode images in a thread pool, one batch ahead of the model, and score
+    # each batch with a single predict call
+    paths = sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                   if name.lower().endswith(IMAGE_EXTENSIONS))
+    batches = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(output, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["path", "prediction", "confidence"])
+
+        decode = lambda batch_paths: [pool.submit(load_digit, path) for path in batch_paths]
+        pending = decode(batches[0]) if batches else []
+        for k, batch_paths in enumerate(batches):
+            images = np.empty((len(batch_paths), 28, 28, 1), dtype=np.float32)
+            for i, future in enumerate(pending):
+                images[i, :, :, 0] = future.result()
+            if k + 1 < len(batches):
+                pending = decode(batches[k + 1])
+
+            images /= 255
+            probabilities = np.asarray(model.predict_on_batch(images))
+            predictions = np.argmax(probabilities, axis=-1)
+            confidences = probabilities[np.arange(len(predictions)), predictions]
+            writer.writerows(zip(batch_paths, predictions, np.round(confidences, 4)))
+
+    elapsed = time.perf_counter() - start
+    print(f"Classified {len(paths)} images in {elapsed:.2f} s "
+          f"({len(paths) / max(elapsed, 1e-9):.0f} images/s), results in {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify handwritten digits with the trained model")
+    parser.add_argument("image", nargs="?", default='/mnt/c/Users/Anubhav_R/Desktop/tmp/AIHPC/3.png',
+                        help="single image to classify")
+    parser.add_argument("--batch", metavar="DIR", help="classify every image in DIR instead")
+    parser.add_argument("--output", default="predictions.csv", help="CSV file for --batch results")
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=8, help="image decoding threads")
+    parser.add_argument("--model", default="test.h5")
+    args = parser.parse_args()
+
+    # The model is loaded once per process, whatever the number of images
+    model = load_model(args.model)
+    if args.batch:
+        classify_directory(model, args.batch, args.output, args.batch_size, args.workers)
+    else:
+        classify_image(model, args.image)
@@ -11,6 +11,7 @@ from tensorflow.keras.optimizers import Adadelta
 from tensorflow.keras import utils
 
 import numpy as np
+import os
 
 from run import *
 
@@ -25,6 +26,8 @@ verbose = 1
 
 def get_dataset(num_classes, rank=0, size=1):
     (x_train, y_train), (x_test, y_test) = mnist.load_data()
+    x_train, y_train = x_train[rank::size], y_train[rank::size]
+    x_test, y_test = x_test[rank::size], y_test[rank::size]
 
     x_train = x_train.reshape(x_train.shape[0], img_rows, img_cols, 1)
     x_test = x_test.reshape(x_test.shape[0], img_rows, img_cols, 1)
@@ -42,6 +45,40 @@ def get_dataset(num_classes, rank=0, size=1):
     return (x_train, y_train), (x_test, y_test)
 
 
+def _shard_pipeline(images, labels, num_classes, batch_size, shuffle, cache):
+    dataset = tf.data.Dataset.from_tensor_slices((images, labels))
+    if cache:
+        # Cache the raw uint8 shard on disk, not the 4x larger float32 version.
+        # An in-memory cache would only duplicate the arrays the dataset wraps
+        dataset = dataset.cache(cache)
+    if shuffle:
+        dataset = dataset.shuffle(len(images), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+
+    def preprocess(x, y):
+        x = tf.cast(tf.reshape(x, (-1, img_rows, img_cols, 1)), tf.float32) / 255
+        return x, tf.one_hot(y, num_classes)
+
+    # Normalisation and one-hot encoding run lazily, per batch, in parallel
+    dataset = dataset.map(preprocess, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def get_dataset_pipeline(num_classes, rank=0, size=1, batch_size=batch_size, cache_dir=None):
+    (x_train, y_train), (x_test, y_test) = mnist.load_data()
+
+    # Keep only this rank's shard of the uint8 data; the full arrays are dropped on return
+    x_train, y_train = x_train[rank::size].copy(), y_train[rank::size].copy()
+    x_test, y_test = x_test[rank::size].copy(), y_test[rank::size].copy()
+
+    cache = lambda name: os.path.join(cache_dir, f"{name}_{rank}") if cache_dir else None
+    train_dataset = _shard_pipeline(x_train, y_train, num_classes, batch_size,
+                                    shuffle=True, cache=cache("train"))
+    test_dataset = _shard_pipeline(x_test, y_test, num_classes, batch_size,
+                                   shuffle=False, cache=cache("test"))
+    return train_dataset, test_dataset
+
+
 def get_model(num_classes):
     model = Sequential()
     model.add(Conv2D(32, kernel_size=(3, 3),
@@ -1,4 +1,7 @@
 import os
+import argparse
+import contextlib
+import json
 import torch
 import torch.nn as nn
 import torch.optim as optim
@@ -9,23 +12,55 @@ import horovod.torch as hvd
 from tqdm import tqdm
 import time
 
+# Horovod fuses small gradients into allreduce buffers of up to this size.
+# hvd.init() reads it once, so change it here or with horovodrun --fusion-threshold-mb
+fusion_threshold_mb = 64
+os.environ.setdefault('HOROVOD_FUSION_THRESHOLD', str(fusion_threshold_mb * 1024 * 1024))
+
 # Initialize Horovod
 hvd.init()
-torch.cuda.set_device(hvd.local_rank())
+
+# Use this worker's GPU when there is one, otherwise run on the CPU; Horovod
+# then reduces CPU tensors with Gloo (e.g. `horovodrun --gloo -np 4 ...`)
+if torch.cuda.is_available():
+    torch.cuda.set_device(hvd.local_rank())
+    device = torch.device('cuda', hvd.local_rank())
+else:
+    device = torch.device('cpu')
 
 # Hyperparameters
 batch_size = 64
 num_epochs = 10
 learning_rate = 0.01
+# Train from normalised CIFAR-10 tensors cached once in shared memory, with
+# random crop and flip done on the device, instead of decoding every image
+# through torchvision transforms on every epoch
+cached_data = True
+# Gradient exchange: 'none' (fp32), 'fp16' or 'topk' (largest topk_ratio of
+# each gradient, with error feedback)
+compression = 'none'
+topk_ratio = 0.01
+# Accumulate gradients over this many batches before each allreduce and step
+backward_passes_per_step = 1
+# Autocast precision: 'fp32', 'bf16' (CPU or GPU) or 'fp16' (GPU, with loss
+# scaling), and whether to keep activations in channels-last memory format
+precision = 'fp32'
+channels_last = False
+
+# CIFAR-10 channel statistics
+cifar10_mean = (0.4914, 0.4822, 0.4465)
+cifar10_std = (0.2470, 0.2435, 0.2616)
+# Files here live in RAM and are shared by all workers on a node
+shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else './data'
 
 # Data Loading
-def get_data_loader(data_dir, batch_size, train=True):
-    transform = transforms.Compose([
-        transforms.Resize(256),
-        transforms.CenterCrop(224),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
-    ])
+def get_data_loader(data_dir, batch_size, train=True, transform=None):
+    # SimpleCNN expects native 32x32 inputs, so the images are not resized
+    if transform is None:
+        transform = transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize(mean=cifar10_mean, std=cifar10_std),
+        ])
     
     dataset = datasets.CIFAR10(root=data_dir, train=train, transform=transform, download=True)
     sampler = data.distributed.DistributedSampler(dataset, num_replicas=hvd.size(), rank=hvd.rank())
@@ -33,6 +68,73 @@ def get_data_loader(data_dir, batch_size, train=True):
     
     return loader
 
+def load_cifar10_shared(data_dir, train=True, cache_dir=shm_dir):
+    # Normalised (N, 3, 32, 32) float32 images and int64 labels, written once
+    # per node by local rank 0 and memory-mapped by every worker, so the node
+    # holds a single copy however many workers it runs
+    split = 'train' if train else 'test'
+    image_path = os.path.join(cache_dir, f'cifar10_{split}_images.f32')
+    label_path = os.path.join(cache_dir, f'cifar10_{split}_labels.i64')
+    if hvd.local_rank() == 0 and not (os.path.exists(image_path) and os.path.exists(label_path)):
+        dataset = datasets.CIFAR10(root=data_dir, train=train, download=True)
+        images = torch.from_numpy(dataset.data).permute(0, 3, 1, 2).float().div_(255)
+        images.sub_(torch.tensor(cifar10_mean).view(1, 3, 1, 1)).div_(torch.tensor(cifar10_std).view(1, 3, 1, 1))
+        # Images last, as their presence marks a complete cache
+        torch.tensor(dataset.targets, dtype=torch.int64).numpy().tofile(label_path)
+        images.numpy().tofile(image_path + '.tmp')
+        os.replace(image_path + '.tmp', image_path)
+    # Wait for the writers before mapping the files
+    hvd.allreduce(torch.zeros(1), name=f'cifar10_{split}_cache')
+
+    num_images = os.path.getsize(label_path) // 8
+    images = torch.from_file(image_path, shared=True, size=num_images * 3 * 32 * 32, dtype=torch.float32)
+    labels = torch.from_file(label_path, shared=True, size=num_images, dtype=torch.int64)
+    return images.view(num_images, 3, 32, 32), labels
+
+class CachedBatches(data.Dataset):
+    # Indexed with a whole batch of indices, so each batch is one gather from
+    # the cached tensors instead of per-sample loading and collation
+    def __init__(self, images, labels):
+        self.images = images
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, indices):
+        indices = torch.as_tensor(indices)
+        return self.images[indices], self.labels[indices]
+
+class EpochBatchSampler(data.BatchSampler):
+    # Lets train() reshuffle through loader.sampler.set_epoch as before
+    def set_epoch(self, epoch):
+        self.sampler.set_epoch(epoch)
+
+def get_cached_data_loader(data_dir, batch_size, train=True, num_workers=2):
+    dataset = CachedBatches(*load_cifar10_shared(data_dir, train))
+    sampler = data.distributed.DistributedSampler(dataset, num_replicas=hvd.size(), rank=hvd.rank(), shuffle=train)
+    loader = data.DataLoader(dataset, batch_size=None, sampler=EpochBatchSampler(sampler, batch_size, drop_last=False),
+                             num_workers=num_workers, pin_memory=device.type == 'cuda',
+                             persistent_workers=num_workers > 0)
+    
+    return loader
+
+def random_crop_flip(images, padding=4):
+    # Random 32x32 crop of the zero-padded batch (zero is the mean colour after
+    # normalisation) and random horizontal flip, drawn per image but applied
+    # with a single gather on the batch's own device
+    n, _, height, width = images.shape
+    padded = nn.functional.pad(images, (padding,) * 4)
+    offset_y = torch.randint(0, 2 * padding + 1, (n, 1, 1), device=images.device)
+    offset_x = torch.randint(0, 2 * padding + 1, (n, 1, 1), device=images.device)
+    flip = torch.rand(n, 1, 1, device=images.device) < 0.5
+    rows = offset_y + torch.arange(height, device=images.device).view(1, height, 1)
+    cols = torch.arange(width, device=images.device).view(1, 1, width)
+    cols = offset_x + torch.where(flip, width - 1 - cols, cols)
+    batch_index = torch.arange(n, device=images.device).view(n, 1, 1)
+    # Advanced indices around the channel slice put the channels last
+    return padded[batch_index, :, rows, cols].permute(0, 3, 1, 2).contiguous()
+
 # Model Definition
 class SimpleCNN(nn.Module):
     def __init__(self):
@@ -47,32 +149,155 @@ class SimpleCNN(nn.Module):
     def forward(self, x):
         x = self.pool(self.relu(self.conv1(x)))
         x = self.pool(self.relu(self.conv2(x)))
-        x = x.view(-1, 128 * 8 * 8)
+        x = x.reshape(-1, 128 * 8 * 8)  # also works for channels-last activations
         x = self.relu(self.fc1(x))
         x = self.fc2(x)
         return x
 
+# Gradient Compression
+def topk_count(numel, ratio=topk_ratio):
+    return max(1, int(numel * ratio))
+
+class TopKDistributedOptimizer:
+    # Sends only the topk_ratio largest-magnitude entries of each gradient
+    # (values and indices, allgathered) and sums them densely on every worker.
+    # The entries left out are kept and added to the next step's gradient
+    # (error feedback), so updates are delayed rather than lost
+    def __init__(self, optimizer, named_parameters, ratio=topk_ratio):
+        self.optimizer = optimizer
+        self.named_parameters = [(name, p) for name, p in named_parameters if p.requires_grad]
+        self.ratio = ratio
+        self.residuals = {}
+        self._skip = False
+
+    @property
+    def param_groups(self):
+        return self.optimizer.param_groups
+
+    def zero_grad(self):
+        self.optimizer.zero_grad()
+
+    def synchronize(self):
+        for name, p in self.named_parameters:
+            if p.grad is None:
+                continue
+            # A copy rather than a view when the gradient is channels-last
+            grad = p.grad.reshape(-1)
+            if name in self.residuals:
+                grad = grad + self.residuals[name]
+            _, indices = grad.abs().topk(topk_count(grad.numel(), self.ratio))
+            values = grad[indices]
+            residual = grad.clone()
+            residual[indices] = 0
+            self.residuals[name] = residual
+
+            dense = torch.zeros_like(grad)
+            dense.index_add_(0, hvd.allgather(indices, name=f'topk.indices.{name}'),
+                             hvd.allgather(values, name=f'topk.values.{name}'))
+            p.grad.copy_(dense.div_(hvd.size()).view_as(p.grad))
+
+    @contextlib.contextmanager
+    def skip_synchronize(self):
+        self._skip = True
+        try:
+            yield
+        finally:
+            self._skip = False
+
+    def step(self):
+        if not self._skip:
+            self.synchronize()
+        return self.optimizer.step()
+
+def make_distributed_optimizer(optimizer, model, compression=compression,
+                               backward_passes_per_step=backward_passes_per_step):
+    if compression == 'topk':
+        return TopKDistributedOptimizer(optimizer, model.named_parameters())
+    return hvd.DistributedOptimizer(
+        optimizer, named_parameters=model.named_parameters(),
+        compression=hvd.Compression.fp16 if compression == 'fp16' else hvd.Compression.none,
+        backward_passes_per_step=backward_passes_per_step)
+
+def gradient_bytes_per_step(model, compression=compression):
+    # Gradient payload each worker puts on the wire per optimizer step
+    total = 0
+    for p in model.parameters():
+        if compression == 'topk':
+            total += topk_count(p.numel()) * (p.element_size() + 8)  # values + int64 indices
+        elif compression == 'fp16':
+            total += p.numel() * 2
+        else:
+            total += p.numel() * p.element_size()
+    return total
+
 # Training Function
-def train(epoch, model, train_loader, optimizer, criterion):
+def optimizer_step(optimizer, scaler):
+    if scaler.is_enabled():
+        # Allreduce the scaled gradients, unscale them, then step without a
+        # second allreduce
+        optimizer.synchronize()
+        scaler.unscale_(optimizer)
+        with optimizer.skip_synchronize():
+            scaler.step(optimizer)
+        scaler.update()
+    else:
+        optimizer.step()
+
+def train(epoch, model, train_loader, optimizer, criterion, augment=None,
+          backward_passes_per_step=backward_passes_per_step, precision='fp32', channels_last=False):
     model.train()
     train_loader.sampler.set_epoch(epoch)
-    running_loss = 0.0
+    # Loss and accuracy stay on the device and are read once per epoch, so
+    # the loop never waits for the device to catch up
+    running_loss = torch.zeros((), device=device)
+    correct = torch.zeros((), dtype=torch.int64, device=device)
     total = 0
-    correct = 0
+    # fp16 gradients need loss scaling against underflow; bf16 has the range of fp32
+    scaler = torch.amp.GradScaler(device.type, enabled=precision == 'fp16')
+    autocast_dtype = torch.float16 if precision == 'fp16' else torch.bfloat16
+    memory_format = torch.channels_last if channels_last else torch.contiguous_format
+    sync = torch.cuda.synchronize if device.type == 'cuda' else (lambda: None)
+
+    start = time.perf_counter()
+    optimizer.zero_grad()
     for batch_idx, (inputs, targets) in enumerate(tqdm(train_loader)):
-        inputs, targets = inputs.cuda(), targets.cuda()
-        optimizer.zero_grad()
-        outputs = model(inputs)
-        loss = criterion(outputs, targets)
-        loss.backward()
-        optimizer.step()
+        inputs, targets = inputs.to(device, non_blocking=True), targets.to(device, non_blocking=True)
+        if augment is not None:
+            inputs = augment(inputs)
+        inputs = inputs.contiguous(memory_format=memory_format)
+        with torch.autocast(device.type, dtype=autocast_dtype, enabled=precision != 'fp32'):
+            outputs = model(inputs)
+            loss = criterion(outputs, targets)
+        scaler.scale(loss / backward_passes_per_step).backward()
+        if (batch_idx + 1) % backward_passes_per_step == 0:
+            optimizer_step(optimizer, scaler)
+            optimizer.zero_grad()
         
-        running_loss += loss.item()
-        _, predicted = outputs.max(1)
+        running_loss += loss.detach()
+        correct += outputs.argmax(1).eq(targets).sum()
         total += targets.size(0)
-        correct += predicted.eq(targets).sum().item()
+    # Apply what is left of an incomplete accumulation
+    if len(train_loader) % backward_passes_per_step:
+        optimizer_step(optimizer, scaler)
+    sync()
+    steps_per_sec = len(train_loader) / (time.perf_counter() - start)
         
-    print(f"Epoch {epoch}, Loss: {running_loss/len(train_loader)}, Accuracy: {100.*correct/total}")
+    print(f"Epoch {epoch}, Loss: {running_loss.item()/len(train_loader)}, Accuracy: {100.*correct.item()/total}, "
+          f"{steps_per_sec:.1f} steps/sec ({precision}{', channels-last' if channels_last else ''})")
+    return steps_per_sec
+
+# Evaluation Function
+def evaluate(model, test_loader):
+    # Test accuracy over all workers' shards
+    model.eval()
+    counts = torch.zeros(2, dtype=torch.float64)
+    with torch.no_grad():
+        for inputs, targets in test_loader:
+            inputs, targets = inputs.to(device), targets.to(device)
+            counts[0] += model(inputs).argmax(1).eq(targets).sum().item()
+            counts[1] += targets.size(0)
+    correct, total = hvd.allreduce(counts, op=hvd.Sum, name='eval_counts').tolist()
+    return 100. * correct / total
 
 # Main Function
 def main():
@@ -80,10 +305,18 @@ def main():
     torch.set_num_threads(4)
     
     data_dir = './data'
-    train_loader = get_data_loader(data_dir, batch_size, train=True)
-    test_loader = get_data_loader(data_dir, batch_size, train=False)
+    if cached_data:
+        train_loader = get_cached_data_loader(data_dir, batch_size, train=True)
+        test_loader = get_cached_data_loader(data_dir, batch_size, train=False)
+        augment = random_crop_flip
+    else:
+        train_loader = get_data_loader(data_dir, batch_size, train=True)
+        test_loader = get_data_loader(data_dir, batch_size, train=False)
+        augment = None
     
-    model = SimpleCNN().cuda()
+    model = SimpleCNN().to(device)
+    if channels_last:
+        model = model.to(memory_format=torch.channels_last)
     
     # Horovod: scale learning rate by the number of GPUs.
     optimizer = optim.SGD(model.parameters(), lr=learning_rate * hvd.size(), momentum=0.9, weight_decay=5e-4)
@@ -93,14 +326,199 @@ def main():
     hvd.broadcast_optimizer_state(optimizer, root_rank=0)
     
     # Horovod: wrap optimizer with DistributedOptimizer.
-    optimizer = hvd.DistributedOptimizer(optimizer, named_parameters=model.named_parameters())
+    optimizer = make_distributed_optimizer(optimizer, model, compression, backward_passes_per_step)
     
-    criterion = nn.CrossEntropyLoss().cuda()
+    criterion = nn.CrossEntropyLoss().to(device)
     
     for epoch in range(1, num_epochs + 1):
-        train(epoch, model, train_loader, optimizer, criterion)
+        train(epoch, model, train_loader, optimizer, criterion, augment, backward_passes_per_step,
+              precision, channels_last)
     
     print("Training complete")
 
+# Compression Comparison
+def compare_compression(data_dir, target_accuracy, max_epochs, backward_passes_per_step):
+    # Train from the same initial weights with each gradient exchange and
+    # report the bytes sent per step and the training time to reach
+    # target_accuracy on the test set (evaluation time excluded)
+    train_loader = get_cached_data_loader(data_dir, batch_size, train=True)
+    test_loader = get_cached_data_loader(data_dir, batch_size, train=False)
+    criterion = nn.CrossEntropyLoss().to(device)
+    steps_per_epoch = -(-len(train_loader) // backward_passes_per_step)
+
+    results = []
+    for option in ['none', 'fp16', 'topk']:
+        torch.manual_seed(0)
+        model = SimpleCNN().to(device)
+        if channels_last:
+            model = model.to(memory_format=torch.channels_last)
+        optimizer = optim.SGD(model.parameters(), lr=learning_rate * hvd.size(), momentum=0.9, weight_decay=5e-4)
+        optimizer = make_distributed_optimizer(optimizer, model, option, backward_passes_per_step)
+
+        elapsed, reached = 0.0, None
+        for epoch in range(1, max_epochs + 1):
+            start = time.perf_counter()
+            train(epoch, model, train_loader, optimizer, criterion, random_crop_flip, backward_passes_per_step,
+                  precision, channels_last)
+            elapsed += time.perf_counter() - start
+            accuracy = evaluate(model, test_loader)
+            if accuracy >= target_accuracy:
+                reached = (epoch, elapsed)
+                break
+        results.append((option, gradient_bytes_per_step(model, option), accuracy, reached))
+
+    if hvd.rank() == 0:
+        fusion_mb = int(os.environ['HOROVOD_FUSION_THRESHOLD']) / 2**20
+        print(f"{hvd.size()} workers, {backward_passes_per_step} backward passes per step "
+              f"({steps_per_epoch} steps/epoch), fusion threshold {fusion_mb:g} MB")
+        baseline = results[0][1]
+        for option, sent, accuracy, reached in results:
+            outcome = (f"{target_accuracy:g}% after {reached[0]} epochs in {reached[1]:.1f} s" if reached else
+                       f"not reached in {max_epochs} epochs (last {accuracy:.1f}%)")
+            print(f"{option:>5}: {sent / 2**20:.2f} MB/step per worker ({sent / baseline:.1%} of fp32), "
+                  f"time to accuracy: {outcome}")
+
+# Data Loader Benchmark
+def benchmark_loaders(data_dir, batch_size, batches):
+    # Images/sec each input pipeline delivers to the device, without training;
+    # the first batch (worker start-up, cache build) is not timed
+    legacy_transform = transforms.Compose([
+        transforms.Resize(256),
+        transforms.CenterCrop(224),
+        transforms.ToTensor(),
+        transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+    ])
+    pipelines = [
+        ('transforms.Compose, resized to 224', get_data_loader(data_dir, batch_size, transform=legacy_transform), None),
+        ('transforms.Compose, native 32x32', get_data_loader(data_dir, batch_size), None),
+        ('shared-memory cache, on-device crop/flip', get_cached_data_loader(data_dir, batch_size), random_crop_flip),
+    ]
+    sync = torch.cuda.synchronize if device.type == 'cuda' else (lambda: None)
+    results = {}
+    for name, loader, augment in pipelines:
+        iterator = iter(loader)
+        next(iterator)
+        count = 0
+        start = time.perf_counter()
+        for _ in range(batches):
+            inputs, targets = next(iterator)
+            inputs, targets = inputs.to(device, non_blocking=True), targets.to(device, non_blocking=True)
+            if augment is not None:
+                inputs = augment(inputs)
+            count += len(inputs)
+        sync()
+        results[name] = count / (time.perf_counter() - start)
+        del iterator
+
+    if hvd.rank() == 0:
+        baseline = results[pipelines[0][0]]
+        for name, images_per_sec in results.items():
+            print(f"{name}: {images_per_sec:.0f} images/sec per worker ({images_per_sec / baseline:.1f}x)")
+
+# Scaling Benchmark
+def benchmark(per_worker_batch_size, steps, warmup_steps=5):
+    # Train SimpleCNN on synthetic CIFAR-sized batches (no download needed) and
+    # time each step, separating the allreduce time the backward pass does not hide
+    torch.manual_seed(hvd.rank())
+    inputs = torch.randn(per_worker_batch_size, 3, 32, 32, device=device)
+    targets = torch.randint(0, 10, (per_worker_batch_size,), device=device)
+
+    model = SimpleCNN().to(device)
+    optimizer = optim.SGD(model.parameters(), lr=learning_rate * hvd.size(), momentum=0.9)
+    hvd.broadcast_parameters(model.state_dict(), root_rank=0)
+    optimizer = make_distributed_optimizer(optimizer, model, compression, backward_passes_per_step=1)
+    criterion = nn.CrossEntropyLoss().to(device)
+
+    sync = torch.cuda.synchronize if device.type == 'cuda' else (lambda: None)
+    step_time = allreduce_time = 0.0
+    for step in range(warmup_steps + steps):
+        sync()
+        start = time.perf_counter()
+        optimizer.zero_grad()
+        loss = criterion(model(inputs), targets)
+        loss.backward()
+        sync()
+        reduce_start = time.perf_counter()
+        optimizer.synchronize()
+        reduce_end = time.perf_counter()
+        with optimizer.skip_synchronize():
+            optimizer.step()
+        sync()
+        if step >= warmup_steps:
+            step_time += time.perf_counter() - start
+            allreduce_time += reduce_end - reduce_start
+
+    # Average the per-worker numbers over all workers
+    totals = hvd.allreduce(torch.tensor([step_time, allreduce_time], dtype=torch.float64), op=hvd.Average)
+    step_time, allreduce_time = totals.tolist()
+    images_per_sec = per_worker_batch_size * steps / step_time
+    return {
+        'workers': hvd.size(),
+        'batch_size_per_worker': per_worker_batch_size,
+        'images_per_sec_per_worker': images_per_sec,
+        'images_per_sec': images_per_sec * hvd.size(),
+        'allreduce_share': allreduce_time / step_time,
+    }
+
+def report_scaling(results_path, result, scaling):
+    # Append this run to the results file and compare it with the 1-worker run
+    # of the same mode: efficiency = throughput_N / (N * throughput_1), which is
+    # the weak-scaling efficiency for a fixed per-worker batch and the
+    # strong-scaling efficiency (speedup / N) for a fixed global batch
+    result = dict(result, scaling=scaling)
+    with open(results_path, 'a') as f:
+        f.write(json.dumps(result) + '\n')
+    with open(results_path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    baselines = [run for run in runs if run['scaling'] == scaling and run['workers'] == 1]
+    efficiency = None
+    if baselines:
+        efficiency = result['images_per_sec'] / (result['workers'] * baselines[-1]['images_per_sec'])
+
+    print(f"{scaling} scaling, {result['workers']} workers, batch {result['batch_size_per_worker']}/worker: "
+          f"{result['images_per_sec_per_worker']:.1f} images/sec/worker, "
+          f"{result['images_per_sec']:.1f} images/sec total, "
+          f"allreduce {100 * result['allreduce_share']:.1f}% of step time, "
+          f"efficiency {'n/a (run with 1 worker first)' if efficiency is None else f'{100 * efficiency:.1f}%'}")
+
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--benchmark', action='store_true',
+                        help='run the synthetic-data scaling benchmark instead of training')
+    parser.add_argument('--scaling', choices=['weak', 'strong'], default='weak',
+                        help='weak: fixed batch per worker, strong: fixed global batch')
+    parser.add_argument('--batch-size', type=int, default=batch_size,
+                        help='batch size per worker (weak) or global batch size (strong)')
+    parser.add_argument('--steps', type=int, default=50)
+    parser.add_argument('--results', default='scaling_results.jsonl')
+    parser.add_argument('--loader-benchmark', action='store_true',
+                        help='compare the throughput of the data loading pipelines')
+    parser.add_argument('--batches', type=int, default=100, help='batches timed per pipeline')
+    parser.add_argument('--compare-compression', action='store_true',
+                        help='report bytes per step and time to accuracy for each gradient compression')
+    parser.add_argument('--target-accuracy', type=float, default=60.0, help='test accuracy in percent')
+    parser.add_argument('--max-epochs', type=int, default=num_epochs)
+    parser.add_argument('--compression', choices=['none', 'fp16', 'topk'], default=compression,
+                        help='gradient compression for training (--compare-compression runs all of them)')
+    parser.add_argument('--backward-passes-per-step', type=int, default=backward_passes_per_step,
+                        help='batches whose gradients are accumulated before each allreduce and step')
+    parser.add_argument('--precision', choices=['fp32', 'bf16', 'fp16'], default=precision,
+                        help='autocast precision for training')
+    parser.add_argument('--channels-last', action='store_true', default=channels_last,
+                        help='train with channels-last memory format')
+    args = parser.parse_args()
+    precision, channels_last = args.precision, args.channels_last
+    compression, backward_passes_per_step = args.compression, args.backward_passes_per_step
+
+    if args.loader_benchmark:
+        benchmark_loaders('./data', args.batch_size, args.batches)
+    elif args.compare_compression:
+        compare_compression('./data', args.target_accuracy, args.max_epochs, backward_passes_per_step)
+    elif args.benchmark:
+        # e.g. for n in 1 2 4 8; do horovodrun --gloo -np $n python <this script> --benchmark; done
+        per_worker = args.batch_size if args.scaling == 'weak' else max(1, args.batch_size // hvd.size())
+        result = benchmark(per_worker, args.steps)
+        if hvd.rank() == 0:
+            report_scaling(args.results, result, args.scaling)
+    else:
+        main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Start the server first, e.g. `python deploy.py --batching`, then run
+# `python bench_deploy.py path/to/test_image.jpg --concurrency 1 8 32 64`
+
+def encode_multipart(field, filename, data):
+    boundary = uuid.uuid4().hex
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; '
+            f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n').encode()
+    body += data + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
+
+def send_request(url, body, content_type):
+    start = time.perf_counter()
+    req = urllib.request.Request(url, data=body, headers={'Content-Type': content_type})
+    with urllib.request.urlopen(req) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def run(url, body, content_type, concurrency, requests_per_client):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(send_request, url, body, content_type)
+                   for _ in range(concurrency * requests_per_client)]
+        latencies = np.array([future.result() for future in futures])
+        elapsed = time.perf_counter() - start
+    return np.percentile(latencies, 50), np.percentile(latencies, 99), len(latencies) / elapsed
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Latency and throughput of the /predict endpoint')
+    parser.add_argument('image', help='image file to send with every request')
+    parser.add_argument('--url', default='http://127.0.0.1:5000/predict')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--requests', type=int, default=20, help='requests per concurrent client')
+    args = parser.parse_args()
+
+    with open(args.image, 'rb') as f:
+        body, content_type = encode_multipart('image', 'image', f.read())
+    send_request(args.url, body, content_type)  # warm up the model
+
+    print(f"{'concurrency':>11} {'p50_ms':>8} {'p99_ms':>8} {'req/s':>8}")
+    for concurrency in args.concurrency:
+        p50, p99, throughput = run(args.url, body, content_type, concurrency, args.requests)
+        print(f"{concurrency:>11} {p50 * 1e3:>8.1f} {p99 * 1e3:>8.1f} {throughput:>8.1f}")
@@ -1,36 +1,163 @@
 import tensorflow as tf
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
+from tensorflow.keras.utils import PyDataset
+import numpy as np
+import json
 import os
 
+from load import load_images
+
 # Define directories
 base_dir = 'path/to/dataset'
 train_dir = os.path.join(base_dir, 'train')
 validation_dir = os.path.join(base_dir, 'validation')
+packed_dir = os.path.join(base_dir, 'packed')
+
+# Decode and resize every image once into a packed uint8 array instead of on
+# every epoch (the feature cache in model.py needs the directory generators)
+use_packed_dataset = False
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+
+def pack_directory(directory, output_dir, target_size=(150, 150), workers=8):
+    # Pack a class-per-subdirectory image folder into images.npy (uint8,
+    # memory-mapped), labels.npy and an index of classes and paths
+    index_path = os.path.join(output_dir, 'index.json')
+    classes = sorted(name for name in os.listdir(directory)
+                     if os.path.isdir(os.path.join(directory, name)))
+    paths, labels = [], []
+    for label, name in enumerate(classes):
+        class_dir = os.path.join(directory, name)
+        for filename in sorted(os.listdir(class_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(class_dir, filename))
+                labels.append(label)
+
+    index = {'classes': classes, 'paths': paths, 'target_size': list(target_size)}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            if json.load(f) == index:
+                return output_dir
+
+    os.makedirs(output_dir, exist_ok=True)
+    height, width = target_size
+    images = np.lib.format.open_memmap(os.path.join(output_dir, 'images.npy'), mode='w+',
+                                       dtype=np.uint8, shape=(len(paths), height, width, 3))
+    load_images(paths, target_size, workers=workers, out=images)
+    images.flush()
+    del images
+    np.save(os.path.join(output_dir, 'labels.npy'), np.array(labels, dtype=np.int32))
+    # Written last, so an interrupted run is packed again
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+    return output_dir
+
+def random_transforms(n, height, width, rng, rotation_range=40, width_shift_range=0.2,
+                      height_shift_range=0.2, shear_range=0.2, zoom_range=0.2, horizontal_flip=True):
+    # One random affine matrix per image, with the same parameters as
+    # ImageDataGenerator (rotation and shear in degrees), built for the whole
+    # batch at once and returned in ImageProjectiveTransform format
+    theta = np.deg2rad(rng.uniform(-rotation_range, rotation_range, n))
+    shear = np.deg2rad(rng.uniform(-shear_range, shear_range, n))
+    zoom_x, zoom_y = rng.uniform(1 - zoom_range, 1 + zoom_range, (2, n))
+    shift_x = rng.uniform(-width_shift_range, width_shift_range, n) * width
+    shift_y = rng.uniform(-height_shift_range, height_shift_range, n) * height
+    flip = np.where(horizontal_flip & (rng.random(n) < 0.5), -1.0, 1.0)
+
+    def matrices(a, b, c, d, e, f):
+        m = np.zeros((n, 3, 3))
+        m[:, 0, 0], m[:, 0, 1], m[:, 0, 2] = a, b, c
+        m[:, 1, 0], m[:, 1, 1], m[:, 1, 2] = d, e, f
+        m[:, 2, 2] = 1.0
+        return m
+
+    zeros, ones = np.zeros(n), np.ones(n)
+    cx, cy = (width - 1) / 2, (height - 1) / 2
+    to_center = matrices(ones, zeros, cx + shift_x, zeros, ones, cy + shift_y)
+    rotation = matrices(np.cos(theta), -np.sin(theta), zeros, np.sin(theta), np.cos(theta), zeros)
+    shearing = matrices(ones, -np.sin(shear), zeros, zeros, np.cos(shear), zeros)
+    scaling = matrices(zoom_x * flip, zeros, zeros, zeros, zoom_y, zeros)
+    from_center = matrices(ones, zeros, -cx * ones, zeros, ones, -cy * ones)
+    m = to_center @ rotation @ shearing @ scaling @ from_center
+    return m.reshape(n, 9)[:, :8].astype(np.float32)
+
+class PackedImageSequence(PyDataset):
+    # Batches read straight from a packed directory; with augment=True the
+    # batch is transformed in one vectorised call, and the batches themselves
+    # are prepared in parallel by the PyDataset workers
+    def __init__(self, packed_path, batch_size=20, augment=False, shuffle=False,
+                 rescale=1.0/255, seed=0, **kwargs):
+        super().__init__(**kwargs)
+        self.images = np.load(os.path.join(packed_path, 'images.npy'), mmap_mode='r')
+        self.labels = np.load(os.path.join(packed_path, 'labels.npy')).astype(np.float32)
+        self.batch_size = batch_size
+        self.augment = augment
+        self.shuffle = shuffle
+        self.rescale = rescale
+        self.seed = seed
+        self.epoch = 0
+        self.order = np.arange(len(self.images))
+        self.on_epoch_end()
+
+    def __len__(self):
+        return int(np.ceil(len(self.images) / self.batch_size))
+
+    def __getitem__(self, idx):
+        # Sorted indices keep the reads from the memory map sequential
+        indices = np.sort(self.order[idx * self.batch_size:(idx + 1) * self.batch_size])
+        batch = self.images[indices].astype(np.float32)
+        if self.augment:
+            rng = np.random.default_rng([self.seed, self.epoch, idx])
+            transforms = random_transforms(len(batch), batch.shape[1], batch.shape[2], rng)
+            batch = tf.raw_ops.ImageProjectiveTransformV3(
+                images=batch, transforms=transforms, output_shape=batch.shape[1:3],
+                fill_value=0.0, interpolation='BILINEAR', fill_mode='NEAREST').numpy()
+        batch *= self.rescale
+        return batch, self.labels[indices]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            np.random.default_rng([self.seed, self.epoch]).shuffle(self.order)
+        self.epoch += 1
+
+if use_packed_dataset:
+    train_generator = PackedImageSequence(
+        pack_directory(train_dir, os.path.join(packed_dir, 'train')),
+        batch_size=20,
+        augment=True,
+        shuffle=True,
+        workers=4
+    )
+
+    validation_generator = PackedImageSequence(
+        pack_directory(validation_dir, os.path.join(packed_dir, 'validation')),
+        batch_size=20
+    )
+else:
+    # Data augmentation and preprocessing
+    train_datagen = ImageDataGenerator(
+        rescale=1.0/255,
+        rotation_range=40,
+        width_shift_range=0.2,
+        height_shift_range=0.2,
+        shear_range=0.2,
+        zoom_range=0.2,
+        horizontal_flip=True,
+        fill_mode='nearest'
+    )
+
+    validation_datagen = ImageDataGenerator(rescale=1.0/255)
+
+    train_generator = train_datagen.flow_from_directory(
+        train_dir,
+        target_size=(150, 150),
+        batch_size=20,
+        class_mode='binary'
+    )
 
-# Data augmentation and preprocessing
-train_datagen = ImageDataGenerator(
-    rescale=1.0/255,
-    rotation_range=40,
-    width_shift_range=0.2,
-    height_shift_range=0.2,
-    shear_range=0.2,
-    zoom_range=0.2,
-    horizontal_flip=True,
-    fill_mode='nearest'
-)
-
-validation_datagen = ImageDataGenerator(rescale=1.0/255)
-
-train_generator = train_datagen.flow_from_directory(
-    train_dir,
-    target_size=(150, 150),
-    batch_size=20,
-    class_mode='binary'
-)
-
-validation_generator = validation_datagen.flow_from_directory(
-    validation_dir,
-    target_size=(150, 150),
-    batch_size=20,
-    class_mode='binary'
-)
+    validation_generator = validation_datagen.flow_from_directory(
+        validation_dir,
+        target_size=(150, 150),
+        batch_size=20,
+        class_mode='binary'
+    )
@@ -1,16 +1,91 @@
+import argparse
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
 from flask import Flask, request, jsonify
 from tensorflow.keras.models import load_model
 
 app = Flask(__name__)
 
 model = load_model('path/to/saved_model.h5')
+batcher = None
+
+def decode_image(data, target_size=(150, 150)):
+    # Decode the uploaded bytes in memory, with the same preprocessing as load_image
+    img = Image.open(io.BytesIO(data)).convert('RGB').resize(target_size[::-1], Image.NEAREST)
+    return np.asarray(img, dtype=np.float32) / 255.
+
+class DynamicBatcher:
+    """Groups concurrent requests into one model.predict call.
+
+    A worker thread waits for the first queued image, then keeps collecting
+    until max_batch_size images are queued or max_wait seconds have passed,
+    runs a single forward pass and hands each caller its own row.
+    """
+
+    def __init__(self, model, max_batch_size=32, max_wait=0.005):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, img_tensor):
+        future = Future()
+        self.requests.put((img_tensor, future))
+        return future
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                preds = self.model.predict_on_batch(np.stack([img for img, _ in batch]))
+                for (_, future), pred in zip(batch, np.asarray(preds)):
+                    future.set_result(pred[np.newaxis])
+            except Exception as error:
+                for _, future in batch:
+                    future.set_exception(error)
 
 @app.route('/predict', methods=['POST'])
 def predict():
     img = request.files['image']
-    img_tensor = load_image(img)
-    pred = model.predict(img_tensor)
+    img_tensor = decode_image(img.read())
+    if batcher is not None:
+        pred = batcher.submit(img_tensor).result()
+    else:
+        pred = model.predict(img_tensor[np.newaxis])
     return jsonify({'prediction': str(pred)})
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    parser = argparse.ArgumentParser(description='Serve the image classifier over HTTP')
+    parser.add_argument('--batching', action='store_true',
+                        help='serve with a dynamic batcher instead of one predict per request')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.batching:
+        batcher = DynamicBatcher(model, args.max_batch_size, args.max_wait_ms / 1000)
+        app.run(port=args.port, threaded=True)
+    else:
+        app.run(port=args.port, debug=True)
@@ -1,4 +1,8 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
+from PIL import Image
 from tensorflow.keras.preprocessing import image
 
 def load_image(img_path, show=False):
@@ -14,7 +18,55 @@ def load_image(img_path, show=False):
 
     return img_tensor
 
-img_path = 'path/to/test_image.jpg'
-new_image = load_image(img_path)
-pred = model.predict(new_image)
-print(f'Prediction: {pred}')
+def _decode(source, target_size):
+    # source is a file path or the encoded image bytes; resized like load_img
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    img = Image.open(source).convert('RGB')
+    if img.size != target_size[::-1]:
+        img = img.resize(target_size[::-1], Image.NEAREST)
+    return np.asarray(img)
+
+def load_images(sources, target_size=(150, 150), dtype=np.float32, workers=8, out=None):
+    # Decode paths or bytes concurrently straight into one (N, H, W, 3) buffer;
+    # float buffers are scaled to [0, 1] like load_image, uint8 ones are raw
+    sources = list(sources)
+    if out is None:
+        out = np.empty((len(sources),) + tuple(target_size) + (3,), dtype=dtype)
+
+    def load(i):
+        out[i] = _decode(sources[i], target_size)
+        if out.dtype != np.uint8:
+            out[i] /= 255.
+
+    # PIL releases the GIL while decoding and resizing, so threads run in parallel
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(load, range(len(sources))))
+    return out[:len(sources)]
+
+def predict_images(model, sources, batch_size=256, target_size=(150, 150), workers=8):
+    # Score any number of images in fixed-size batches, decoding batch k+1 in
+    # the background while the model runs on batch k
+    sources = list(sources)
+    batches = [sources[i:i + batch_size] for i in range(0, len(sources), batch_size)]
+    buffers = [np.empty((batch_size,) + tuple(target_size) + (3,), dtype=np.float32) for _ in range(2)]
+    preds = None
+
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        load = lambda k: loader.submit(load_images, batches[k], target_size, workers=workers, out=buffers[k % 2])
+        pending = load(0) if batches else None
+        for k in range(len(batches)):
+            batch = pending.result()
+            if k + 1 < len(batches):
+                pending = load(k + 1)
+            batch_preds = np.asarray(model.predict_on_batch(batch))
+            if preds is None:
+                preds = np.empty((len(sources),) + batch_preds.shape[1:], dtype=batch_preds.dtype)
+            preds[k * batch_size:k * batch_size + len(batch)] = batch_preds
+    return preds
+
+if __name__ == '__main__':
+    img_path = 'path/to/test_image.jpg'
+    new_image = load_image(img_path)
+    pred = model.predict(new_image)
+    print(f'Prediction: {pred}')
@@ -1,24 +1,114 @@
+import hashlib
+import json
+import os
+
+import numpy as np
 from tensorflow.keras.applications import VGG16
 from tensorflow.keras import layers, models
+from tensorflow.keras.preprocessing.image import ImageDataGenerator
+
+# Train only the dense head on cached VGG16 features instead of sending every
+# image through the convolutional base on every epoch
+use_feature_cache = False
+feature_cache_dir = 'feature_cache'
+
+def weights_digest(model):
+    digest = hashlib.sha256()
+    for weights in model.get_weights():
+        digest.update(weights.tobytes())
+    return digest.hexdigest()
+
+def feature_cache_key(conv_base, generator):
+    # Any change to the base weights, the preprocessing or the image files
+    # yields a different key, and therefore a fresh cache entry
+    key = hashlib.sha256(weights_digest(conv_base).encode())
+    key.update(json.dumps({
+        'target_size': list(generator.target_size),
+        'color_mode': generator.color_mode,
+        'rescale': generator.image_data_generator.rescale,
+    }).encode())
+    for path in generator.filepaths:
+        stat = os.stat(path)
+        key.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+    return key.hexdigest()[:16]
+
+def extract_features(conv_base, generator, cache_dir=feature_cache_dir, batch_size=64):
+    # Run conv_base once over the generator's images (in file order, without
+    # augmentation) and keep the bottleneck features in a memory-mapped .npy
+    entry = os.path.join(cache_dir, feature_cache_key(conv_base, generator))
+    if not os.path.exists(entry):
+        iterator = ImageDataGenerator(rescale=generator.image_data_generator.rescale).flow_from_directory(
+            generator.directory,
+            target_size=generator.target_size,
+            color_mode=generator.color_mode,
+            classes=list(generator.class_indices),
+            class_mode=generator.class_mode,
+            batch_size=batch_size,
+            shuffle=False
+        )
+        tmp_entry = entry + '.tmp'
+        os.makedirs(tmp_entry, exist_ok=True)
+        features = np.lib.format.open_memmap(
+            os.path.join(tmp_entry, 'features.npy'), mode='w+', dtype=np.float32,
+            shape=(iterator.samples,) + tuple(conv_base.output_shape[1:]))
+        for k in range(len(iterator)):
+            images, _ = iterator[k]
+            features[k * batch_size:k * batch_size + len(images)] = conv_base.predict_on_batch(images)
+        features.flush()
+        del features
+        np.save(os.path.join(tmp_entry, 'labels.npy'), iterator.classes)
+        with open(os.path.join(tmp_entry, 'paths.json'), 'w') as f:
+            json.dump(iterator.filepaths, f)
+        # Publish the entry only once it is complete
+        os.replace(tmp_entry, entry)
+
+    features = np.load(os.path.join(entry, 'features.npy'), mmap_mode='r')
+    labels = np.load(os.path.join(entry, 'labels.npy'))
+    return features, labels
+
+def build_head(input_shape):
+    head = models.Sequential()
+    head.add(layers.Input(shape=input_shape))
+    head.add(layers.Flatten())
+    head.add(layers.Dense(256, activation='relu'))
+    head.add(layers.Dense(1, activation='sigmoid'))
+    head.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+    return head
 
 # Load the pre-trained VGG16 model without the top layer
 conv_base = VGG16(weights='imagenet', include_top=False, input_shape=(150, 150, 3))
 
-# Build the model
-model = models.Sequential()
-model.add(conv_base)
-model.add(layers.Flatten())
-model.add(layers.Dense(256, activation='relu'))
-model.add(layers.Dense(1, activation='sigmoid'))
-
-# Compile the model
-model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-
-# Train the model
-history = model.fit(
-    train_generator,
-    steps_per_epoch=100,
-    epochs=30,
-    validation_data=validation_generator,
-    validation_steps=50
-)
+if use_feature_cache:
+    train_features, train_labels = extract_features(conv_base, train_generator)
+    validation_features, validation_labels = extract_features(conv_base, validation_generator)
+
+    # Train the head from the cache
+    head = build_head(train_features.shape[1:])
+    history = head.fit(
+        train_features, train_labels,
+        batch_size=20,
+        epochs=30,
+        validation_data=(validation_features, validation_labels)
+    )
+
+    # Same architecture as below, for inference on images
+    model = models.Sequential([conv_base, head])
+else:
+    # Build the model
+    model = models.Sequential()
+    model.add(conv_base)
+    model.add(layers.Flatten())
+    model.add(layers.Dense(256, activation='relu'))
+    model.add(layers.Dense(1, activation='sigmoid'))
+
+    # Compile the model
+    model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
+
+    # Train the model
+    history = model.fit(
+        train_generator,
+        steps_per_epoch=100,
+        epochs=30,
+        validation_data=validation_generator,
+        validation_steps=50
+    )
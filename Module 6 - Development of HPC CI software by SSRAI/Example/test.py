@@ -1,5 +1,10 @@
+import io
 import unittest
 
+import numpy as np
+from PIL import Image
+from load import load_image, load_images
+
 class TestImageClassification(unittest.TestCase):
     def test_image_preprocessing(self):
         img_path = 'path/to/test_image.jpg'
@@ -12,5 +17,19 @@ class TestImageClassification(unittest.TestCase):
         pred = model.predict(img_tensor)
         self.assertTrue(pred is not None)
 
+    def test_batch_image_loading(self):
+        rng = np.random.default_rng(0)
+        sources = []
+        for size in [(150, 150), (200, 120), (90, 160)]:
+            buffer = io.BytesIO()
+            Image.fromarray(rng.integers(0, 256, size + (3,), dtype=np.uint8)).save(buffer, format='PNG')
+            sources.append(buffer.getvalue())
+
+        img_tensors = load_images(sources)
+        self.assertEqual(img_tensors.shape, (3, 150, 150, 3))
+        self.assertEqual(img_tensors.dtype, np.float32)
+        self.assertLessEqual(img_tensors.max(), 1.0)
+        self.assertEqual(load_images(sources, dtype=np.uint8).dtype, np.uint8)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy.special import expit, softmax
+
+def _label_index(model, y):
+    # Position of each label in model.classes_
+    return np.searchsorted(model.classes_, y)
+
+def input_gradient(model, X, y):
+    # Gradient of the log loss with respect to the inputs of a fitted linear
+    # classifier (LogisticRegression, or SGDClassifier with log_loss), for all
+    # rows at once: (p - y) w for two classes, (softmax - onehot) W otherwise
+    return _scores_and_gradient(model, X, _label_index(model, y))[1]
+
+def _scores_and_gradient(model, X, labels):
+    scores = model.decision_function(X)
+    if scores.ndim == 1:
+        grad = np.outer(expit(scores) - labels, model.coef_[0])
+        predicted = (scores > 0).astype(np.intp)
+    else:
+        residual = softmax(scores, axis=1)
+        residual[np.arange(len(X)), labels] -= 1
+        grad = residual @ model.coef_
+        predicted = scores.argmax(axis=1)
+    return predicted, grad
+
+def fgsm_attack(model, X, epsilon, y=None, chunk_size=65536, out=None):
+    # Fast gradient sign method: one step of size epsilon along the sign of
+    # the loss gradient. Without y the model's own predictions are attacked.
+    # Rows are processed chunk_size at a time, so pass a memory-mapped `out`
+    # to attack more points than fit in memory
+    return pgd_attack(model, X, y, epsilon, step_size=epsilon, steps=1, early_stop=False,
+                      chunk_size=chunk_size, out=out)
+
+def pgd_attack(model, X, y=None, epsilon=0.1, step_size=None, steps=10, early_stop=True,
+               chunk_size=65536, out=None):
+    # L-infinity projected gradient descent: repeated signed gradient steps,
+    # each projected back into the epsilon-box around the original point.
+    # With early_stop, samples stop moving as soon as they are misclassified
+    if step_size is None:
+        step_size = 2.5 * epsilon / steps
+    if out is None:
+        out = np.empty(X.shape, dtype=np.result_type(X.dtype, np.float64))
+
+    for start in range(0, len(X), chunk_size):
+        x_orig = np.asarray(X[start:start + chunk_size])
+        x = out[start:start + chunk_size]
+        x[:] = x_orig
+        if y is None:
+            labels = _label_index(model, model.predict(x_orig))
+        else:
+            labels = _label_index(model, np.asarray(y[start:start + chunk_size]))
+
+        active = np.arange(len(x))
+        for _ in range(steps):
+            predicted, grad = _scores_and_gradient(model, x[active], labels[active])
+            if early_stop:
+                still_correct = predicted == labels[active]
+                active, grad = active[still_correct], grad[still_correct]
+                if not len(active):
+                    break
+            x_active = x[active] + step_size * np.sign(grad)
+            x[active] = np.clip(x_active, x_orig[active] - epsilon, x_orig[active] + epsilon)
+    return out
@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from scipy.stats import chi2
+from sklearn.covariance import MinCovDet
+from sklearn.neighbors import KDTree
+
+class PoisonDetector:
+    """Screens training data batch by batch before it reaches the model.
+
+    Each new batch is scored only against the points accepted so far, so
+    appending a batch never rescores the existing set:
+
+    - label consistency: the fraction of a point's n_neighbors nearest
+      accepted points (KD-tree queries) whose label differs from its own;
+    - robust Mahalanobis distance to the point's own class. The first batch
+      of a class is screened with MinCovDet; after that the class mean and
+      covariance are running estimates over the accepted points only.
+
+    Points above max_disagreement or beyond the chi-squared quantile are
+    rejected and never enter the index or the class statistics.
+    """
+
+    def __init__(self, n_neighbors=10, max_disagreement=0.7, quantile=0.999,
+                 robust_sample=10000, leaf_size=40, chunk_size=65536, workers=8):
+        self.n_neighbors = n_neighbors
+        self.max_disagreement = max_disagreement
+        self.quantile = quantile
+        self.robust_sample = robust_sample
+        self.leaf_size = leaf_size
+        self.chunk_size = chunk_size
+        self.workers = workers
+        # KD-trees over the accepted points, with sizes decreasing along the
+        # list: a new block is merged with the smaller trees before indexing,
+        # so each point is re-indexed only O(log n) times in total
+        self.trees = []
+        # Per class: [count, mean, sum of squared deviations, inverse covariance]
+        self.class_stats = {}
+
+    @property
+    def n_accepted(self):
+        return sum(len(labels) for _, labels in self.trees)
+
+    def _neighbor_labels(self, X):
+        dists, labels = [], []
+        for tree, tree_labels in self.trees:
+            d, i = tree.query(X, k=min(self.n_neighbors, len(tree_labels)))
+            dists.append(d)
+            labels.append(tree_labels[i])
+        nearest = np.argsort(np.hstack(dists), axis=1, kind='stable')[:, :self.n_neighbors]
+        return np.take_along_axis(np.hstack(labels), nearest, axis=1)
+
+    def _disagreement(self, X, y):
+        if not self.trees:
+            # First batch: leave-one-out neighbours within the batch itself
+            _, i = KDTree(X, leaf_size=self.leaf_size).query(X, k=min(self.n_neighbors + 1, len(X)))
+            return (y[i[:, 1:]] != y[:, np.newaxis]).mean(axis=1)
+
+        # Queries run in chunks on a thread pool; KDTree.query releases the GIL
+        chunks = range(0, len(X), self.chunk_size)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            neighbor_labels = list(pool.map(lambda s: self._neighbor_labels(X[s:s + self.chunk_size]), chunks))
+        return (np.vstack(neighbor_labels) != y[:, np.newaxis]).mean(axis=1)
+
+    def _mahalanobis(self, X, y):
+        distances = np.zeros(len(X))
+        for label in np.unique(y):
+            rows = y == label
+            precision = self.class_stats.get(label, [None] * 4)[3]
+            if precision is not None:
+                centered = X[rows] - self.class_stats[label][1]
+                distances[rows] = np.einsum('ij,jk,ik->i', centered, precision, centered)
+            elif rows.sum() > X.shape[1] + 1:
+                # Class not estimated yet: robust fit on (a sample of) this
+                # batch alone, as MinCovDet does not scale to large batches
+                class_rows = X[rows]
+                sample = np.random.default_rng(0).permutation(len(class_rows))[:self.robust_sample]
+                distances[rows] = MinCovDet(random_state=0).fit(class_rows[sample]).mahalanobis(class_rows)
+        return distances
+
+    def _update_class_stats(self, X, y):
+        # Chan et al. merge of the accepted points into the running estimates
+        for label in np.unique(y):
+            batch = X[y == label]
+            count, mean, m2, precision = self.class_stats.get(label, [0, 0, 0, None])
+            n = len(batch)
+            batch_mean = batch.mean(axis=0)
+            batch_m2 = (batch - batch_mean).T @ (batch - batch_mean)
+            delta = batch_mean - mean
+            total = count + n
+            mean = mean + delta * n / total
+            m2 = m2 + batch_m2 + np.outer(delta, delta) * count * n / total
+            if total > X.shape[1] + 1:
+                precision = np.linalg.pinv(m2 / (total - 1))
+            self.class_stats[label] = [total, mean, m2, precision]
+
+    def score(self, X, y):
+        # (label disagreement, squared Mahalanobis distance) for each row
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+        return self._disagreement(X, y), self._mahalanobis(X, y)
+
+    def partial_fit(self, X, y):
+        # Score a new batch, add the accepted rows to the index and the class
+        # statistics, and return the boolean mask of accepted rows
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+        disagreement, distance = self.score(X, y)
+        accepted = (disagreement <= self.max_disagreement) & (distance <= chi2.ppf(self.quantile, X.shape[1]))
+        if accepted.any():
+            self._add_to_index(X[accepted], y[accepted])
+            self._update_class_stats(X[accepted], y[accepted])
+        return accepted
+
+    def _add_to_index(self, X, y):
+        while self.trees and len(self.trees[-1][1]) <= len(y):
+            tree, labels = self.trees.pop()
+            X, y = np.vstack([np.asarray(tree.data), X]), np.concatenate([labels, y])
+        self.trees.append((KDTree(X, leaf_size=self.leaf_size), y))
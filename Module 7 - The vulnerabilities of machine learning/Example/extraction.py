@@ -0,0 +1,66 @@
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score
+
+# ru_maxrss is in bytes on macOS and in kilobytes on Linux
+RSS_PER_MB = 1024 ** 2 if sys.platform == 'darwin' else 1024
+
+def uncertainty(model, X):
+    # Higher for points closer to the model's decision boundary
+    scores = model.decision_function(X)
+    if scores.ndim == 1:
+        return -np.abs(scores)
+    top2 = np.partition(scores, -2, axis=1)[:, -2:]
+    return top2[:, 0] - top2[:, 1]
+
+def next_queries(strategy, surrogate, rng, n, low, high, oversample=10, explore=0.1):
+    # 'uniform' samples the input box; 'boundary' keeps the uniform candidates
+    # the current surrogate is least sure about, plus a share of uniform
+    # points so regions the surrogate has wrong are still explored
+    if strategy == 'uniform' or surrogate is None:
+        return rng.uniform(low, high, size=(n, len(low)))
+    n_boundary = max(1, n - int(n * explore))
+    candidates = rng.uniform(low, high, size=(n_boundary * oversample, len(low)))
+    closest = np.argpartition(-uncertainty(surrogate, candidates), n_boundary - 1)[:n_boundary]
+    return np.vstack([candidates[closest], rng.uniform(low, high, size=(n - n_boundary, len(low)))])
+
+def run_extraction(victim, X_eval, y_eval, budgets, strategy='uniform', surrogate=None,
+                   low=-3, high=3, batch_size=10000, seed=0):
+    # Query the victim in batches and update the surrogate with partial_fit
+    # after each one, so memory stays flat however many queries are made.
+    # At every budget in `budgets` the surrogate is scored on X_eval, both
+    # against y_eval (accuracy) and against the victim (fidelity)
+    rng = np.random.default_rng(seed)
+    low = np.broadcast_to(np.asarray(low, dtype=np.float64), X_eval.shape[1:])
+    high = np.broadcast_to(np.asarray(high, dtype=np.float64), X_eval.shape[1:])
+    if surrogate is None:
+        surrogate = SGDClassifier(loss='log_loss', random_state=seed)
+    victim_eval = victim.predict(X_eval)
+
+    rows, queries, elapsed, fitted = [], 0, 0.0, False
+    for budget in sorted(budgets):
+        while queries < budget:
+            n = min(batch_size, budget - queries)
+            start = time.perf_counter()
+            X_query = next_queries(strategy, surrogate if fitted else None, rng, n, low, high)
+            surrogate.partial_fit(X_query, victim.predict(X_query), classes=victim.classes_)
+            elapsed += time.perf_counter() - start
+            queries += n
+            fitted = True
+
+        predicted = surrogate.predict(X_eval)
+        rows.append({
+            'strategy': strategy,
+            'queries': queries,
+            'accuracy': accuracy_score(y_eval, predicted),
+            'fidelity': accuracy_score(victim_eval, predicted),
+            'queries_per_sec': queries / elapsed,
+            # Peak resident memory of the whole process so far
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_PER_MB,
+        })
+    return pd.DataFrame(rows)
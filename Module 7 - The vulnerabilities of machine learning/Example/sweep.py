@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+
+from attacks import fgsm_attack, pgd_attack
+
+# Attacks by name, all called as attack(model, X, y, epsilon)
+ATTACKS = {
+    'fgsm': lambda model, X, y, epsilon: fgsm_attack(model, X, epsilon, y),
+    'pgd': lambda model, X, y, epsilon: pgd_attack(model, X, y, epsilon, steps=20),
+}
+
+# Per-process state set up by _init_worker
+_worker = {}
+
+def _share(array):
+    # Copy an array into a new shared memory block; workers map it by name
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=shm.buf)[:] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _attach(spec):
+    name, shape, dtype = spec
+    # Pool workers share the parent's resource tracker, so attaching does
+    # not make them owners; the parent unlinks the block
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype, buffer=shm.buf)
+
+def _init_worker(models, specs):
+    # Models are small and pickled once per worker; the arrays are not
+    # copied at all
+    _worker['models'] = models
+    for name, spec in specs.items():
+        _worker[name + '_shm'], _worker[name] = _attach(spec)
+
+def _digest(*arrays):
+    digest = hashlib.sha256()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+def _cache_path(cache_dir, key, config):
+    # Changes whenever the key (a fitted model, say) or the config do
+    digest = hashlib.sha256(key)
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return os.path.join(cache_dir, digest.hexdigest()[:16] + '.json')
+
+def _run_cells(cells, task, cache_dir, models=None, arrays=None, workers=None):
+    # Rows for all (path, cell) pairs: cached ones are read back, the others
+    # run as task(**cell) in a process pool with `arrays` in shared memory,
+    # and their results are cached as they complete
+    os.makedirs(cache_dir, exist_ok=True)
+    rows, pending = [], []
+    for path, cell in cells:
+        if os.path.exists(path):
+            with open(path) as f:
+                rows.append(dict(json.load(f), **cell, cached=True))
+        else:
+            pending.append((path, cell))
+    if not pending:
+        return rows
+
+    shared = {name: _share(np.ascontiguousarray(array)) for name, array in (arrays or {}).items()}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(models, {name: spec for name, (_, spec) in shared.items()})) as pool:
+            futures = {pool.submit(task, **cell): (path, cell) for path, cell in pending}
+            for future in as_completed(futures):
+                path, cell = futures[future]
+                row = dict(cell, **future.result())
+                with open(path + '.tmp', 'w') as f:
+                    json.dump(row, f)
+                os.replace(path + '.tmp', path)
+                rows.append(dict(row, cached=False))
+    finally:
+        for shm, _ in shared.values():
+            shm.close()
+            shm.unlink()
+    return rows
+
+def _run_attack_cell(model, attack, epsilon):
+    estimator, X, y = _worker['models'][model], _worker['X'], _worker['y']
+    start = time.perf_counter()
+    X_adv = ATTACKS[attack](estimator, X, y, epsilon) if epsilon > 0 else X
+    accuracy = accuracy_score(y, estimator.predict(X_adv))
+    return {'accuracy': accuracy, 'seconds': time.perf_counter() - start}
+
+def run_sweep(models, X, y, epsilons, attacks=('fgsm', 'pgd'), cache_dir='sweep_cache', workers=None):
+    # Accuracy of every (model, attack, epsilon) cell as one tidy table.
+    # Cells already in cache_dir are read back; the rest run in a process pool
+    data_digest = _digest(X, y)
+    cells = []
+    for model_name, model in models.items():
+        for attack in attacks:
+            for epsilon in epsilons:
+                config = {'attack': attack, 'epsilon': float(epsilon), 'data': data_digest}
+                cells.append((_cache_path(cache_dir, pickle.dumps(model), config),
+                              {'model': model_name, 'attack': attack, 'epsilon': float(epsilon)}))
+
+    rows = _run_cells(cells, _run_attack_cell, cache_dir, models, {'X': X, 'y': y}, workers)
+    results = pd.DataFrame(rows, columns=['model', 'attack', 'epsilon', 'accuracy', 'seconds', 'cached'])
+    return results.sort_values(['model', 'attack', 'epsilon'], ignore_index=True)
+
+def _fit_dp_cell(epsilon, seed, data_norm):
+    from diffprivlib.models import LogisticRegression as DPLogisticRegression
+
+    start = time.perf_counter()
+    model = DPLogisticRegression(epsilon=epsilon, data_norm=data_norm, random_state=seed)
+    model.fit(_worker['X_train'], _worker['y_train'])
+    accuracy = accuracy_score(_worker['y_test'], model.predict(_worker['X_test']))
+    return {'accuracy': accuracy, 'seconds': time.perf_counter() - start}
+
+def run_dp_sweep(X_train, y_train, X_test, y_test, epsilons, seeds=range(10), data_norm=None,
+                 cache_dir='sweep_cache', workers=None):
+    # Fit a DPLogisticRegression for every (epsilon, seed) and return the
+    # per-fit table and the mean and variance of test accuracy per epsilon.
+    # Pass data_norm to avoid diffprivlib deriving it from the data
+    data_digest = _digest(X_train, y_train, X_test, y_test)
+    cells = []
+    for epsilon in epsilons:
+        for seed in seeds:
+            cell = {'epsilon': float(epsilon), 'seed': int(seed), 'data_norm': data_norm}
+            cells.append((_cache_path(cache_dir, b'DPLogisticRegression', dict(cell, data=data_digest)), cell))
+
+    rows = _run_cells(cells, _fit_dp_cell, cache_dir, arrays={
+        'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test}, workers=workers)
+    fits = pd.DataFrame(rows, columns=['epsilon', 'seed', 'data_norm', 'accuracy', 'seconds', 'cached'])
+    fits = fits.sort_values(['epsilon', 'seed'], ignore_index=True)
+    summary = fits.groupby('epsilon')['accuracy'].agg(mean_accuracy='mean', var_accuracy='var', fits='count')
+    return fits, summary.reset_index()
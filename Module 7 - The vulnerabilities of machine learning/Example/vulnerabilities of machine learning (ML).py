@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
 from sklearn.datasets import make_moons
 from sklearn.model_selection import train_test_split
@@ -6,102 +7,157 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 from sklearn.neighbors import KNeighborsClassifier
-
-# 1. Adversarial Attacks
-# Let's create a simple binary classification model and show how adversarial attacks can fool it.
-
-# Generate synthetic data
-X, y = make_moons(n_samples=1000, noise=0.3, random_state=42)
-
-# Split data into training and test sets
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Standardize the data
-scaler = StandardScaler()
-X_train = scaler.fit_transform(X_train)
-X_test = scaler.transform(X_test)
-
-# Train a logistic regression model
-clf = LogisticRegression()
-clf.fit(X_train, y_train)
-
-# Evaluate the model
-y_pred = clf.predict(X_test)
-initial_accuracy = accuracy_score(y_test, y_pred)
-print(f"Initial Model Accuracy: {initial_accuracy * 100:.2f}%")
-
-# Adversarial example creation (FGSM)
-def fgsm_attack(model, X, epsilon):
-    # Calculate gradients
-    grad = np.zeros_like(X)
-    for i in range(len(X)):
-        grad[i] = np.sign(X[i])
-    # Apply perturbation
-    X_adv = X + epsilon * grad
-    return X_adv
-
-epsilon = 0.1
-X_test_adv = fgsm_attack(clf, X_test, epsilon)
-
-# Evaluate the model on adversarial examples
-y_pred_adv = clf.predict(X_test_adv)
-adversarial_accuracy = accuracy_score(y_test, y_pred_adv)
-print(f"Model Accuracy on Adversarial Examples: {adversarial_accuracy * 100:.2f}%")
-
-# Plot original vs adversarial examples
-plt.figure(figsize=(10, 5))
-plt.subplot(1, 2, 1)
-plt.title("Original Test Data")
-plt.scatter(X_test[:, 0], X_test[:, 1], c=y_test)
-plt.subplot(1, 2, 2)
-plt.title("Adversarial Test Data")
-plt.scatter(X_test_adv[:, 0], X_test_adv[:, 1], c=y_test)
-plt.show()
-
-# 2. Data Poisoning
-# Injecting malicious data into the training set to corrupt the model.
-
-# Add poison data points
-X_poison = np.random.normal(loc=3, scale=0.1, size=(50, 2))
-y_poison = np.ones(50)  # Assuming the target class is 1
-X_train_poisoned = np.vstack((X_train, X_poison))
-y_train_poisoned = np.hstack((y_train, y_poison))
-
-# Train a new model on poisoned data
-clf_poisoned = LogisticRegression()
-clf_poisoned.fit(X_train_poisoned, y_train_poisoned)
-
-# Evaluate the poisoned model
-y_pred_poisoned = clf_poisoned.predict(X_test)
-poisoned_accuracy = accuracy_score(y_test, y_pred_poisoned)
-print(f"Model Accuracy with Poisoned Data: {poisoned_accuracy * 100:.2f}%")
-
-# 3. Model Theft
-# Simulating model stealing by training a surrogate model on the outputs of the target model.
-
-# Assume attacker queries the target model and gets responses
-X_attack = np.random.uniform(low=-3, high=3, size=(500, 2))
-y_attack = clf.predict(X_attack)
-
-# Attacker trains a surrogate model
-surrogate_model = KNeighborsClassifier(n_neighbors=3)
-surrogate_model.fit(X_attack, y_attack)
-
-# Evaluate surrogate model
-y_surrogate_pred = surrogate_model.predict(X_test)
-surrogate_accuracy = accuracy_score(y_test, y_surrogate_pred)
-print(f"Surrogate Model Accuracy: {surrogate_accuracy * 100:.2f}%")
-
-# 4. Privacy Concerns
-# Differential privacy to protect sensitive training data.
-
-from diffprivlib.models import LogisticRegression as DPLogisticRegression
-
-# Train a differentially private model
-dp_clf = DPLogisticRegression(epsilon=1.0)
-dp_clf.fit(X_train, y_train)
-
-# Evaluate the differentially private model
-y_dp_pred = dp_clf.predict(X_test)
-dp_accuracy = accuracy_score(y_test, y_dp_pred)
-print(f"Differentially Private Model Accuracy: {dp_accuracy * 100:.2f}%")
+from attacks import fgsm_attack, pgd_attack
+from sweep import run_dp_sweep, run_sweep
+from defenses import PoisonDetector
+from extraction import run_extraction
+
+def main():
+    # 1. Adversarial Attacks
+    # Let's create a simple binary classification model and show how adversarial attacks can fool it.
+
+    # Generate synthetic data
+    X, y = make_moons(n_samples=1000, noise=0.3, random_state=42)
+
+    # Split data into training and test sets
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    # Standardize the data
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+
+    # Train a logistic regression model
+    clf = LogisticRegression()
+    clf.fit(X_train, y_train)
+
+    # Evaluate the model
+    y_pred = clf.predict(X_test)
+    initial_accuracy = accuracy_score(y_test, y_pred)
+    print(f"Initial Model Accuracy: {initial_accuracy * 100:.2f}%")
+
+    # Adversarial example creation (FGSM), using the model's input gradient
+    epsilon = 0.1
+    X_test_adv = fgsm_attack(clf, X_test, epsilon, y_test)
+
+    # Evaluate the model on adversarial examples
+    y_pred_adv = clf.predict(X_test_adv)
+    adversarial_accuracy = accuracy_score(y_test, y_pred_adv)
+    print(f"Model Accuracy on Adversarial Examples: {adversarial_accuracy * 100:.2f}%")
+
+    # Multi-step attack (PGD) within the same epsilon
+    X_test_pgd = pgd_attack(clf, X_test, y_test, epsilon, steps=20)
+    pgd_accuracy = accuracy_score(y_test, clf.predict(X_test_pgd))
+    print(f"Model Accuracy on PGD Adversarial Examples: {pgd_accuracy * 100:.2f}%")
+
+    # Plot original vs adversarial examples
+    plt.figure(figsize=(10, 5))
+    plt.subplot(1, 2, 1)
+    plt.title("Original Test Data")
+    plt.scatter(X_test[:, 0], X_test[:, 1], c=y_test)
+    plt.subplot(1, 2, 2)
+    plt.title("Adversarial Test Data")
+    plt.scatter(X_test_adv[:, 0], X_test_adv[:, 1], c=y_test)
+    plt.show()
+
+    # 2. Data Poisoning
+    # Injecting malicious data into the training set to corrupt the model.
+
+    # Add poison data points
+    X_poison = np.random.normal(loc=3, scale=0.1, size=(50, 2))
+    y_poison = np.ones(50)  # Assuming the target class is 1
+    X_train_poisoned = np.vstack((X_train, X_poison))
+    y_train_poisoned = np.hstack((y_train, y_poison))
+
+    # Train a new model on poisoned data
+    clf_poisoned = LogisticRegression()
+    clf_poisoned.fit(X_train_poisoned, y_train_poisoned)
+
+    # Evaluate the poisoned model
+    y_pred_poisoned = clf_poisoned.predict(X_test)
+    poisoned_accuracy = accuracy_score(y_test, y_pred_poisoned)
+    print(f"Model Accuracy with Poisoned Data: {poisoned_accuracy * 100:.2f}%")
+
+    # Defence: screen the training data as it arrives, in batches, and train only
+    # on the accepted points (each batch is scored against the points accepted
+    # before it, so the whole set is never rescored)
+    detector = PoisonDetector()
+    batch_size = 200
+    accepted = np.concatenate([
+        detector.partial_fit(X_train_poisoned[start:start + batch_size], y_train_poisoned[start:start + batch_size])
+        for start in range(0, len(X_train_poisoned), batch_size)
+    ])
+    is_poison = np.arange(len(X_train_poisoned)) >= len(X_train)
+    print(f"Rejected {np.sum(~accepted & is_poison)} of {len(X_poison)} poison points "
+          f"and {np.sum(~accepted & ~is_poison)} of {len(X_train)} clean points")
+
+    clf_sanitized = LogisticRegression()
+    clf_sanitized.fit(X_train_poisoned[accepted], y_train_poisoned[accepted])
+    sanitized_accuracy = accuracy_score(y_test, clf_sanitized.predict(X_test))
+    print(f"Model Accuracy with Sanitised Data: {sanitized_accuracy * 100:.2f}%")
+
+    # 3. Model Theft
+    # Simulating model stealing by training a surrogate model on the outputs of the target model.
+
+    # Assume attacker queries the target model and gets responses
+    X_attack = np.random.uniform(low=-3, high=3, size=(500, 2))
+    y_attack = clf.predict(X_attack)
+
+    # Attacker trains a surrogate model
+    surrogate_model = KNeighborsClassifier(n_neighbors=3)
+    surrogate_model.fit(X_attack, y_attack)
+
+    # Evaluate surrogate model
+    y_surrogate_pred = surrogate_model.predict(X_test)
+    surrogate_accuracy = accuracy_score(y_test, y_surrogate_pred)
+    print(f"Surrogate Model Accuracy: {surrogate_accuracy * 100:.2f}%")
+
+    # Extraction at scale: up to a million batched queries, random or focused on
+    # the surrogate's decision boundary, with an incrementally trained surrogate
+    budgets = [100, 1_000, 10_000, 100_000, 1_000_000]
+    extraction = pd.concat([run_extraction(clf, X_test, y_test, budgets, strategy=strategy)
+                            for strategy in ['uniform', 'boundary']], ignore_index=True)
+    print(extraction.to_string(index=False))
+
+    # 4. Privacy Concerns
+    # Differential privacy to protect sensitive training data.
+
+    from diffprivlib.models import LogisticRegression as DPLogisticRegression
+
+    # Train a differentially private model
+    dp_clf = DPLogisticRegression(epsilon=1.0)
+    dp_clf.fit(X_train, y_train)
+
+    # Evaluate the differentially private model
+    y_dp_pred = dp_clf.predict(X_test)
+    dp_accuracy = accuracy_score(y_test, y_dp_pred)
+    print(f"Differentially Private Model Accuracy: {dp_accuracy * 100:.2f}%")
+
+    # Privacy budget sweep: DP training is noisy, so each epsilon is fitted with
+    # several seeds; fits run in parallel and are cached, so a repeated or
+    # extended sweep only trains the missing cells
+    dp_fits, dp_summary = run_dp_sweep(X_train, y_train, X_test, y_test,
+                                       epsilons=[0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0], seeds=range(20))
+    print(dp_summary.to_string(index=False))
+
+    # 5. Robustness Sweep
+    # Accuracy-vs-epsilon curves for every model and attack, computed in parallel
+    # and cached, so only new cells are run again
+
+    results = run_sweep({'clf': clf, 'clf_poisoned': clf_poisoned, 'dp_clf': dp_clf},
+                        X_test, y_test, epsilons=np.linspace(0, 1, 21))
+    print(results.to_string(index=False))
+
+    plt.figure(figsize=(8, 5))
+    for (model_name, attack), curve in results.groupby(['model', 'attack']):
+        plt.plot(curve['epsilon'], curve['accuracy'], marker='.', label=f"{model_name} ({attack})")
+    plt.xlabel("Epsilon")
+    plt.ylabel("Accuracy")
+    plt.title("Accuracy under Adversarial Attack")
+    plt.legend()
+    plt.show()
+
+if __name__ == '__main__':
+    # The sweeps start process pools, whose workers import this script under
+    # the spawn start method (the default on macOS and Windows)
+    main()
@@ -0,0 +1,167 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from scipy.special import expit
+
+# Tuning constants giving 95% efficiency at the normal distribution
+DEFAULT_C = {'huber': 1.345, 'tukey': 4.685}
+
+def huber_weights(r, c=DEFAULT_C['huber']):
+    abs_r = np.abs(r)
+    return np.where(abs_r <= c, 1.0, c / np.maximum(abs_r, 1e-300))
+
+def tukey_weights(r, c=DEFAULT_C['tukey']):
+    u = np.clip(r / c, -1.0, 1.0)
+    return (1 - u ** 2) ** 2
+
+WEIGHTS = {'huber': huber_weights, 'tukey': tukey_weights}
+
+# Per-process view of the shared design matrix and targets
+_worker = {}
+
+def _init_worker(X_spec, y_spec):
+    for name, (shm_name, shape, dtype) in (('X', X_spec), ('y', y_spec)):
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker[name + '_shm'], _worker[name] = shm, np.ndarray(shape, dtype, buffer=shm.buf)
+
+def _normal_equations(start, stop, coef, scale, loss, c, task, X=None, y=None):
+    # X^T W X and X^T W z for rows start:stop at the current coefficients
+    X = _worker['X'][start:stop] if X is None else X[start:stop]
+    y = _worker['y'][start:stop] if y is None else y[start:stop]
+    eta = X @ coef
+    if task == 'regression':
+        # Unit weights (least squares) until there is a scale estimate
+        w = WEIGHTS[loss]((y - eta) / scale, c) if scale else np.ones(len(y))
+        z = y
+    else:
+        # Logistic IRLS, with the robustness weights applied to the Pearson residuals
+        mu = expit(eta)
+        variance = np.maximum(mu * (1 - mu), 1e-10)
+        w = WEIGHTS[loss]((y - mu) / np.sqrt(variance), c) * variance
+        z = eta + (y - mu) / variance
+    Xw = X * w[:, np.newaxis]
+    return Xw.T @ X, Xw.T @ z
+
+class MEstimator:
+    """Huber or Tukey M-estimation for linear regression or binary logistic
+    classification, fitted by iteratively reweighted least squares.
+
+    Each iteration splits the rows into chunks; a process pool computes the
+    weighted normal-equation terms of each chunk from a shared-memory copy of
+    the data, and the parent sums them and solves for the new coefficients.
+    With warm_start=True, fit() starts from the previous coefficients, so
+    refitting after new rows arrive takes only a few iterations.
+    """
+
+    def __init__(self, loss='huber', task='regression', c=None, fit_intercept=True, alpha=1e-8,
+                 max_iter=100, tol=1e-6, warm_start=False, n_jobs=None, chunk_size=100_000,
+                 scale_sample=100_000, random_state=0):
+        self.loss = loss
+        self.task = task
+        self.c = DEFAULT_C[loss] if c is None else c
+        self.fit_intercept = fit_intercept
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.tol = tol
+        self.warm_start = warm_start
+        self.n_jobs = n_jobs
+        self.chunk_size = chunk_size
+        self.scale_sample = scale_sample
+        self.random_state = random_state
+        self.coef_ = None
+        self.intercept_ = 0.0
+        self.scale_ = None
+
+    def _design(self, X, out=None):
+        X = np.asarray(X, dtype=np.float64)
+        if out is None:
+            out = np.empty((len(X), X.shape[1] + self.fit_intercept))
+        out[:, :X.shape[1]] = X
+        if self.fit_intercept:
+            out[:, -1] = 1.0
+        return out
+
+    def _robust_scale(self, X, y, coef, sample):
+        # Normalised median absolute deviation of the residuals, from a fixed
+        # row sample so the parent never needs all the residuals
+        residuals = y[sample] - X[sample] @ coef
+        return np.median(np.abs(residuals - np.median(residuals))) / 0.6745
+
+    def fit(self, X, y):
+        y = np.asarray(y)
+        if self.task == 'classification':
+            self.classes_ = np.unique(y)
+            if len(self.classes_) != 2:
+                raise ValueError(f"Classification needs exactly 2 classes, got {len(self.classes_)}")
+            y = (y == self.classes_[1]).astype(np.float64)
+        else:
+            y = y.astype(np.float64)
+        n_samples, n_features = len(y), np.shape(X)[1] + self.fit_intercept
+
+        if self.warm_start and self.coef_ is not None:
+            coef = np.append(self.coef_, self.intercept_) if self.fit_intercept else self.coef_.copy()
+            scale = self.scale_
+        else:
+            coef, scale = np.zeros(n_features), None
+        sample = np.random.default_rng(self.random_state).permutation(n_samples)[:self.scale_sample]
+        chunks = [(start, min(start + self.chunk_size, n_samples)) for start in range(0, n_samples, self.chunk_size)]
+
+        shms, pool = [], None
+        try:
+            if len(chunks) > 1:
+                # Large data: the design matrix is built straight into shared memory
+                X_shm = shared_memory.SharedMemory(create=True, size=n_samples * n_features * 8)
+                y_shm = shared_memory.SharedMemory(create=True, size=max(y.nbytes, 1))
+                shms = [X_shm, y_shm]
+                X_design = self._design(X, np.ndarray((n_samples, n_features), buffer=X_shm.buf))
+                y_shared = np.ndarray(y.shape, y.dtype, buffer=y_shm.buf)
+                y_shared[:] = y
+                pool = ProcessPoolExecutor(max_workers=self.n_jobs, initializer=_init_worker, initargs=(
+                    (X_shm.name, X_design.shape, X_design.dtype.str), (y_shm.name, y.shape, y.dtype.str)))
+            else:
+                X_design = self._design(X)
+
+            for n_iter in range(1, self.max_iter + 1):
+                if self.task == 'regression' and (scale is not None or n_iter > 1):
+                    scale = self._robust_scale(X_design, y, coef, sample) or 1.0
+                args = (coef, scale, self.loss, self.c, self.task)
+                if pool is None:
+                    pieces = [_normal_equations(start, stop, *args, X=X_design, y=y) for start, stop in chunks]
+                else:
+                    pieces = list(pool.map(_normal_equations, *zip(*chunks), *([arg] * len(chunks) for arg in args)))
+                XtWX = sum(piece[0] for piece in pieces) + self.alpha * np.eye(n_features)
+                XtWz = sum(piece[1] for piece in pieces)
+                new_coef = np.linalg.solve(XtWX, XtWz)
+                converged = np.max(np.abs(new_coef - coef)) <= self.tol * (1 + np.max(np.abs(coef)))
+                coef = new_coef
+                # A cold regression fit starts with a least-squares pass, which
+                # only provides the starting point
+                if converged and (self.task != 'regression' or scale is not None):
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+        if self.fit_intercept:
+            self.coef_, self.intercept_ = coef[:-1], coef[-1]
+        else:
+            self.coef_ = coef
+        self.scale_ = scale
+        self.n_iter_ = n_iter
+        return self
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X):
+        p = expit(self.decision_function(X))
+        return np.column_stack([1 - p, p])
+
+    def predict(self, X):
+        if self.task == 'classification':
+            return self.classes_[(self.decision_function(X) > 0).astype(int)]
+        return self.decision_function(X)
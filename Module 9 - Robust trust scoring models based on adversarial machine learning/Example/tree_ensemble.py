@@ -0,0 +1,104 @@
+import numpy as np
+import torch
+
+def flatten_forest(forest):
+    # All trees of a fitted sklearn forest classifier as flat arrays indexed
+    # by a global node id. Leaves point to themselves as both children, so a
+    # batch can take max_depth steps without checking which rows are done
+    offsets = np.cumsum([0] + [est.tree_.node_count for est in forest.estimators_])
+    feature, threshold, left, right, value = [], [], [], [], []
+    for offset, est in zip(offsets, forest.estimators_):
+        tree = est.tree_
+        ids = np.arange(tree.node_count)
+        is_leaf = tree.children_left < 0
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+        left.append(np.where(is_leaf, ids, tree.children_left) + offset)
+        right.append(np.where(is_leaf, ids, tree.children_right) + offset)
+        leaf_value = tree.value[:, 0, :]
+        value.append(leaf_value / leaf_value.sum(axis=1, keepdims=True))
+
+    left = np.concatenate(left)
+    return {
+        'feature': np.concatenate(feature),
+        # float64 as in sklearn, so float32 inputs compare exactly the same
+        'threshold': np.concatenate(threshold),
+        'left': left,
+        'right': np.concatenate(right),
+        'value': np.concatenate(value).astype(np.float32),
+        'roots': offsets[:-1],
+        'is_leaf': left == np.arange(len(left)),
+        'max_depth': max(est.tree_.max_depth for est in forest.estimators_),
+    }
+
+def forest_predict_proba(flat, X):
+    # Same as forest.predict_proba, with every tree and every row advanced one
+    # level per step as a single array operation
+    X = np.asarray(X, dtype=np.float32)
+    node = np.broadcast_to(flat['roots'], (len(X), len(flat['roots'])))
+    for _ in range(flat['max_depth']):
+        go_left = np.take_along_axis(X, flat['feature'][node], axis=1) <= flat['threshold'][node]
+        node = np.where(go_left, flat['left'][node], flat['right'][node])
+    return flat['value'][node].mean(axis=1)
+
+class CompiledForest(torch.nn.Module):
+    # The forest's exact predictions as tensor operations, returned as log
+    # probabilities; piecewise constant, so it has no useful gradient
+    def __init__(self, forest):
+        super().__init__()
+        flat = flatten_forest(forest)
+        for name in ('feature', 'threshold', 'left', 'right', 'value', 'roots'):
+            self.register_buffer(name, torch.as_tensor(flat[name]))
+        self.max_depth = flat['max_depth']
+
+    def forward(self, x):
+        node = self.roots.expand(len(x), -1)
+        for _ in range(self.max_depth):
+            go_left = x.gather(1, self.feature[node]) <= self.threshold[node]
+            node = torch.where(go_left, self.left[node], self.right[node])
+        return torch.log(self.value[node].mean(dim=1).clamp_min(1e-12))
+
+class SoftForest(torch.nn.Module):
+    # Differentiable surrogate of the forest: each split sends a row right
+    # with probability sigmoid((x[feature] - threshold) / temperature) instead
+    # of all or nothing, and the prediction averages the leaf values weighted
+    # by the probability of reaching each leaf. Returns log probabilities and
+    # approaches the forest as temperature goes to 0
+    def __init__(self, forest, temperature=0.1):
+        super().__init__()
+        flat = flatten_forest(forest)
+        self.temperature = temperature
+        self.n_trees = len(flat['roots'])
+        is_leaf, value = flat['is_leaf'], flat['value']
+        roots = flat['roots']
+        # Trees that are a single leaf always contribute the same value
+        self.register_buffer('constant', torch.as_tensor(value[roots[is_leaf[roots]]].sum(axis=0)))
+
+        # The internal nodes of all trees, one level at a time. Only the
+        # current level's reach probabilities are kept: children that are
+        # leaves add to the prediction, the others form the next level
+        nodes = roots[~is_leaf[roots]]
+        self.n_levels = 0
+        while len(nodes):
+            children = np.concatenate([flat['left'][nodes], flat['right'][nodes]])
+            leaf = is_leaf[children]
+            level = self.n_levels
+            self.register_buffer(f'level{level}_feature', torch.as_tensor(flat['feature'][nodes]))
+            self.register_buffer(f'level{level}_threshold', torch.as_tensor(flat['threshold'][nodes], dtype=torch.float32))
+            self.register_buffer(f'level{level}_leaves', torch.as_tensor(np.flatnonzero(leaf)))
+            self.register_buffer(f'level{level}_leaf_value', torch.as_tensor(value[children[leaf]]))
+            self.register_buffer(f'level{level}_internal', torch.as_tensor(np.flatnonzero(~leaf)))
+            nodes = children[~leaf]
+            self.n_levels += 1
+
+    def forward(self, x):
+        reach = x.new_ones(len(x), len(self.level0_feature)) if self.n_levels else None
+        proba = self.constant.expand(len(x), -1)
+        for level in range(self.n_levels):
+            feature, threshold, leaves, leaf_value, internal = (
+                getattr(self, f'level{level}_{name}') for name in ('feature', 'threshold', 'leaves', 'leaf_value', 'internal'))
+            go_right = torch.sigmoid((x[:, feature] - threshold) / self.temperature)
+            children = torch.cat([reach * (1 - go_right), reach * go_right], dim=1)
+            proba = proba + children[:, leaves] @ leaf_value
+            reach = children[:, internal]
+        return torch.log((proba / self.n_trees).clamp_min(1e-12))
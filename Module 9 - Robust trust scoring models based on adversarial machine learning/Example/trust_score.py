@@ -0,0 +1,62 @@
+import joblib
+import numpy as np
+from sklearn.neighbors import KDTree
+
+class TrustScorer:
+    """Trust score of a prediction from per-class nearest-neighbour indexes.
+
+    The score is the distance from a point to the nearest training point of
+    any other class, divided by its distance to the nearest training point
+    of the predicted class: well above 1 when the prediction agrees with the
+    neighbourhood, below 1 when another class is closer.
+
+    One KD-tree per class is built once by fit() and can be saved and
+    loaded, so an online service only runs the batched queries.
+    """
+
+    def __init__(self, alpha=0.0, k=10, leaf_size=40):
+        # alpha: fraction of each class's training points, those in its
+        # sparsest regions (largest k-th neighbour distance), left out of
+        # the index so isolated or mislabelled points do not count
+        self.alpha = alpha
+        self.k = k
+        self.leaf_size = leaf_size
+        self.classes_ = None
+        self.trees = []
+
+    def fit(self, X, y):
+        X, y = np.asarray(X, dtype=np.float64), np.asarray(y)
+        self.classes_ = np.unique(y)
+        self.trees = []
+        for label in self.classes_:
+            points = X[y == label]
+            if self.alpha > 0 and len(points) > self.k:
+                radius = KDTree(points, leaf_size=self.leaf_size).query(points, k=self.k + 1)[0][:, -1]
+                points = points[radius <= np.quantile(radius, 1 - self.alpha)]
+            self.trees.append(KDTree(points, leaf_size=self.leaf_size))
+        return self
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+    def class_distances(self, X):
+        # (n_samples, n_classes) distance to the nearest indexed point of each class
+        X = np.asarray(X, dtype=np.float64)
+        return np.column_stack([tree.query(X, k=1)[0][:, 0] for tree in self.trees])
+
+    def score(self, X, y_pred):
+        distances = self.class_distances(X)
+        rows = np.arange(len(distances))
+        predicted = np.searchsorted(self.classes_, y_pred)
+        to_predicted = distances[rows, predicted]
+        distances[rows, predicted] = np.inf
+        return distances.min(axis=1) / np.maximum(to_predicted, 1e-12)
+
+    def predict(self, model, X):
+        # model.predict output together with its trust scores
+        y_pred = model.predict(X)
+        return y_pred, self.score(X, y_pred)